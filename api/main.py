@@ -0,0 +1,147 @@
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from resume_generator import (
+    ATSScorer,
+    ScoreReport,
+    MarkdownFormatter,
+    agenerate_resume,
+    agenerate_best_resume
+)
+from resume_generator.job_profile import get_job_profile_store
+from resume_generator.instrumentation import instrumentation
+from resume_generator.output_repair import repair_stats
+from resume_generator.rate_limiter import RateLimitTimeout, get_rate_limiter
+from .models import (
+    GenerateRequest,
+    GenerateResponse,
+    AnalyzeRequest,
+    AnalyzeResponse,
+    ScoreRequest,
+    FormatRequest,
+    FormatResponse
+)
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests and rejects new ones once the queue is full.
+    
+    Up to ``max_concurrent`` requests run at once and up to ``max_queued``
+    more wait for a slot; anything beyond that is refused with 429 so
+    overload turns into fast backpressure instead of unbounded latency.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked() and self._waiting >= self.max_queued:
+            self.rejected += 1
+            raise HTTPException(status_code=429, detail="Server is busy, retry later", headers={"Retry-After": "1"})
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            'max_concurrent': self.max_concurrent,
+            'waiting': self._waiting,
+            'rejected': self.rejected
+        }
+
+app = FastAPI(title=settings.APP_NAME)
+scorer = ATSScorer()
+llm_limiter = ConcurrencyLimiter(settings.API_MAX_CONCURRENT_LLM, settings.API_MAX_QUEUED)
+scoring_limiter = ConcurrencyLimiter(settings.API_MAX_CONCURRENT_SCORING, settings.API_MAX_QUEUED)
+# Postings are profiled once and shared by every request that targets them
+job_profiles = get_job_profile_store()
+
+@app.exception_handler(RateLimitTimeout)
+async def rate_limit_timeout(request: Request, exc: RateLimitTimeout) -> JSONResponse:
+    """The shared LLM rate budget stayed exhausted for the maximum wait."""
+    return JSONResponse(status_code=429, content={'detail': str(exc)}, headers={"Retry-After": "5"})
+
+@app.post("/generate", response_model=GenerateResponse)
+async def generate(request: GenerateRequest) -> GenerateResponse:
+    """Generate an ATS-optimized resume and score it."""
+    # Weight the prompt by required and preferred skills when the posting was analyzed
+    profile = await job_profiles.aget_or_build(request.job_description, analyze=False, prefer_analyzed=True)
+    if request.best_of:
+        async with llm_limiter.slot():
+            resume, report = await agenerate_best_resume(
+                job_description=request.job_description,
+                user_info=request.user_info.model_dump(),
+                scorer=scorer,
+                job_profile=profile,
+                scoring_slot=scoring_limiter.slot
+            )
+        return GenerateResponse(
+            resume=resume,
+            markdown=MarkdownFormatter.format_resume(resume),
+            ats_score=report.total_score,
+            suggestions=report.suggestions
+        )
+    async with llm_limiter.slot():
+        resume = await agenerate_resume(
+            job_description=request.job_description,
+            user_info=request.user_info.model_dump(),
+            job_profile=profile
+        )
+    async with scoring_limiter.slot():
+        markdown = MarkdownFormatter.format_resume(resume)
+        report = await run_in_threadpool(scorer.analyze_profile, markdown, profile)
+    return GenerateResponse(
+        resume=resume,
+        markdown=markdown,
+        ats_score=report.total_score,
+        suggestions=report.suggestions
+    )
+
+@app.post("/analyze", response_model=AnalyzeResponse)
+async def analyze(request: AnalyzeRequest) -> AnalyzeResponse:
+    """Analyze a job description; each posting is analyzed once and then served from the profile store."""
+    async with llm_limiter.slot():
+        profile = await job_profiles.aget_or_build(request.job_description)
+    return AnalyzeResponse(analysis=profile.analysis, markdown=MarkdownFormatter.format_job_analysis(profile.analysis))
+
+@app.post("/score", response_model=ScoreReport)
+async def score(request: ScoreRequest) -> ScoreReport:
+    """Score a resume against a job description."""
+    async with scoring_limiter.slot():
+        profile = await job_profiles.aget_or_build(request.job_description, analyze=False)
+        return await run_in_threadpool(scorer.analyze_profile, request.resume_text, profile)
+
+@app.post("/format", response_model=FormatResponse)
+async def format_resume(request: FormatRequest) -> FormatResponse:
+    """Render a resume as markdown."""
+    return FormatResponse(markdown=MarkdownFormatter.format_resume(request.resume))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    """Expose pipeline counters and histograms in the Prometheus text format."""
+    return instrumentation.render_prometheus()
+
+@app.get("/health")
+async def health() -> dict:
+    """Report liveness, limiter state, shared rate budgets and structured-output repair rates."""
+    rate_limiter = get_rate_limiter()
+    return {
+        'status': 'ok',
+        'llm': llm_limiter.stats(),
+        'scoring': scoring_limiter.stats(),
+        'rate_limit': await run_in_threadpool(rate_limiter.stats) if rate_limiter is not None else None,
+        'structured_output': repair_stats.snapshot()
+    }
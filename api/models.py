@@ -0,0 +1,85 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from resume_generator import ResumeContent, JobAnalysis
+
+class PersonalInfo(BaseModel):
+    """Personal information of the candidate."""
+    full_name: str
+    email: str
+    phone: str
+    location: str
+    title: str
+    linkedin: Optional[str] = None
+    website: Optional[str] = None
+    portfolio: Optional[str] = None
+
+class Education(BaseModel):
+    """An education entry."""
+    institution: str
+    degree: str
+    field: str
+    start_date: str
+    end_date: str
+    gpa: Optional[str] = None
+    coursework: Optional[str] = None
+    achievements: Optional[str] = None
+
+class Experience(BaseModel):
+    """A work experience entry."""
+    company: str
+    job_title: str
+    start_date: str
+    end_date: str
+    location: str
+    responsibilities: str
+    achievements: str = ""
+    tools: str = ""
+
+class Skills(BaseModel):
+    """Skills of the candidate, one per line in each field."""
+    technical_skills: str = ""
+    soft_skills: str = ""
+    languages: str = ""
+    certifications: str = ""
+
+class UserInfo(BaseModel):
+    """Everything known about the candidate."""
+    personal_info: PersonalInfo
+    education: List[Education] = Field(default_factory=list)
+    experience: List[Experience] = Field(default_factory=list)
+    skills: Skills = Field(default_factory=Skills)
+
+class GenerateRequest(BaseModel):
+    """Request body for resume generation."""
+    user_info: UserInfo
+    job_description: str
+    best_of: bool = Field(False, description="Generate candidates at several temperatures and keep the best")
+
+class GenerateResponse(BaseModel):
+    """Generated resume with its markdown rendering and ATS analysis."""
+    resume: ResumeContent
+    markdown: str
+    ats_score: float
+    suggestions: List[str]
+
+class AnalyzeRequest(BaseModel):
+    """Request body for job description analysis."""
+    job_description: str
+
+class AnalyzeResponse(BaseModel):
+    """Structured job description analysis produced by the LLM."""
+    analysis: JobAnalysis
+    markdown: str
+
+class ScoreRequest(BaseModel):
+    """Request body for ATS scoring."""
+    resume_text: str
+    job_description: str
+
+class FormatRequest(BaseModel):
+    """Request body for markdown rendering."""
+    resume: ResumeContent
+
+class FormatResponse(BaseModel):
+    """Markdown rendering of a resume."""
+    markdown: str
@@ -1,6 +1,10 @@
 import streamlit as st
 from config import settings
-from resume_generator import generate_resume, analyze_job_description, ATSScorer, MarkdownFormatter
+from resume_generator import ATSScorer, MarkdownFormatter, ResumeSection
+from resume_generator.streaming import stream_resume
+from resume_generator.memo import SessionMemo, content_hash
+from resume_generator.exporter import ResumeExporter, pdf_backend
+from resume_generator.resume_store import get_resume_store
 
 # Set page configuration
 st.set_page_config(
@@ -256,53 +260,152 @@ def show_job_description_form():
     st.text_input("Company Name (optional)", value=st.session_state.job_description['target_company'], key="target_company")
     st.text_input("Industry (optional)", value=st.session_state.job_description['industry'], key="industry")
 
+@st.cache_resource
+def get_ats_scorer():
+    """One scorer per server process, shared across sessions and reruns."""
+    return ATSScorer()
+
+@st.cache_resource
+def get_exporter():
+    """One exporter per server process, so rendered downloads are cached across sessions."""
+    return ResumeExporter()
+
+def show_resume_versions(resume, user_info, job_description):
+    """Save the generated resume as a version of its application and compare saved versions."""
+    st.markdown("### Saved Versions")
+    store = get_resume_store()
+    target = st.session_state.job_description
+    default_application = " - ".join(part for part in (target['target_company'], target['target_position']) if part)
+    application = st.text_input("Application", value=default_application or "Untitled application", key="application_name")
+    label = st.text_input("Version label (optional)", key="version_label")
+    if st.button("Save Version"):
+        version = store.save(application, resume, label=label, profile=user_info, job_description=job_description)
+        st.success(f"Saved version {version.id} of {application}")
+    
+    versions = store.list_versions(application)
+    if len(versions) < 2:
+        return
+    names = {f"v{version.id} {version.label}".strip(): version.id for version in versions}
+    choices = list(names)
+    col1, col2 = st.columns(2)
+    with col1:
+        old = st.selectbox("Compare version", choices, index=len(choices) - 2, key="diff_old")
+    with col2:
+        new = st.selectbox("with version", choices, index=len(choices) - 1, key="diff_new")
+    diff = store.diff(names[old], names[new])
+    if not diff.changes:
+        st.info("The versions are identical.")
+    for change in diff.changes:
+        st.markdown(f"**{change.name}** ({change.status})")
+        st.code(change.diff, language="diff")
+
+def stream_resume_preview(job_description, user_info):
+    """Generate a resume, rendering each section as soon as it completes."""
+    preview = st.empty()
+    with preview.container():
+        st.markdown("### Resume Preview")
+        status = st.empty()
+        placeholders = {field: st.empty() for field in ('summary', 'experience', 'education', 'skills')}
+    rendered = {'experience': [], 'education': []}
+    first_section_at = None
+    tokens = 0
+    resume = None
+    
+    for event in stream_resume(job_description=job_description, user_info=user_info):
+        if event.kind == 'token':
+            tokens += 1
+            if first_section_at is None:
+                status.caption(f"Generating your resume... {tokens} chunks received")
+        elif event.field in rendered and event.kind == 'item':
+            rendered[event.field].append(MarkdownFormatter.format_section(ResumeSection(**event.value)))
+            placeholders[event.field].markdown("".join(rendered[event.field]))
+        elif event.kind == 'section' and event.field in placeholders:
+            if first_section_at is None:
+                first_section_at = event.elapsed
+            if event.field == 'summary':
+                placeholders['summary'].markdown(MarkdownFormatter.format_summary(event.value))
+            elif event.field == 'skills':
+                placeholders['skills'].markdown(MarkdownFormatter.format_skills(event.value))
+        elif event.kind == 'complete':
+            resume = event.value
+            st.session_state.generation_timing = (
+                f"First section after {first_section_at or event.elapsed:.2f}s, "
+                f"complete after {event.elapsed:.2f}s"
+            )
+    
+    # The final result is rendered from the memoized artifacts instead
+    preview.empty()
+    return resume
+
 def show_resume_generation():
     st.header("Generate Resume")
     
+    memo = SessionMemo(st.session_state)
+    job_description = st.session_state.job_description['description']
+    
+    # Prepare user info dictionary
+    user_info = {
+        'personal_info': st.session_state.personal_info,
+        'education': st.session_state.education,
+        'experience': st.session_state.experience,
+        'skills': st.session_state.skills
+    }
+    inputs_hash = content_hash(user_info, job_description)
+    
     if st.button("Generate ATS-Optimized Resume"):
-        with st.spinner("Generating your resume..."):
-            # Prepare user info dictionary
-            user_info = {
-                'personal_info': st.session_state.personal_info,
-                'education': st.session_state.education,
-                'experience': st.session_state.experience,
-                'skills': st.session_state.skills
-            }
-            
-            # Generate resume
-            resume = generate_resume(
-                job_description=st.session_state.job_description['description'],
-                user_info=user_info
-            )
-            
-            # Calculate ATS score
-            ats_scorer = ATSScorer()
-            ats_score = ats_scorer.calculate_ats_score(
-                resume_text=MarkdownFormatter.format_resume(resume),
-                job_description=st.session_state.job_description['description']
-            )
-            
-            # Get improvement suggestions
-            suggestions = ats_scorer.get_improvement_suggestions(
-                resume_text=MarkdownFormatter.format_resume(resume),
-                job_description=st.session_state.job_description['description']
-            )
-            
-            # Display resume preview
-            st.markdown("### Resume Preview")
-            st.markdown(MarkdownFormatter.format_resume(resume))
-            
-            # Display ATS analysis
-            st.markdown("### ATS Analysis")
-            st.markdown(MarkdownFormatter.format_ats_analysis(ats_score, suggestions))
-            
-            # Add download button
-            st.download_button(
-                label="Download Resume (Markdown)",
-                data=MarkdownFormatter.format_resume(resume),
-                file_name="resume.md",
-                mime="text/markdown"
-            )
+        resume = memo.get('resume', user_info, job_description)
+        if resume is None:
+            resume = stream_resume_preview(job_description, user_info)
+            memo.set('resume', (user_info, job_description), resume)
+        else:
+            st.session_state.generation_timing = "Served from this session's earlier generation"
+        st.session_state.generated_resume = resume
+        st.session_state.generated_inputs_hash = inputs_hash
+    
+    # Results survive reruns; derived artifacts are recomputed only when their inputs change
+    resume = st.session_state.get('generated_resume')
+    if resume is None:
+        return
+    if st.session_state.get('generated_inputs_hash') != inputs_hash:
+        st.info("Your profile or the job description changed since this resume was generated.")
+    
+    resume_markdown = memo.get_or_compute('markdown', (resume,), MarkdownFormatter.format_resume)
+    
+    # Calculate ATS score and improvement suggestions in one pass
+    report = memo.get_or_compute('ats_report', (resume_markdown, job_description), get_ats_scorer().analyze)
+    
+    # Display resume preview
+    st.markdown("### Resume Preview")
+    if st.session_state.get('generation_timing'):
+        st.caption(st.session_state.generation_timing)
+    st.markdown(resume_markdown)
+    
+    # Display ATS analysis
+    st.markdown("### ATS Analysis")
+    st.markdown(MarkdownFormatter.format_ats_analysis(report.total_score, report.suggestions))
+    
+    # Add download buttons
+    st.download_button(
+        label="Download Resume (Markdown)",
+        data=resume_markdown,
+        file_name="resume.md",
+        mime="text/markdown"
+    )
+    st.download_button(
+        label="Download Resume (HTML)",
+        data=get_exporter().render(resume, 'html'),
+        file_name="resume.html",
+        mime="text/html"
+    )
+    if pdf_backend():
+        st.download_button(
+            label="Download Resume (PDF)",
+            data=get_exporter().render(resume, 'pdf'),
+            file_name="resume.pdf",
+            mime="application/pdf"
+        )
+    
+    show_resume_versions(resume, user_info, job_description)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,199 @@
+from typing import Callable, Dict, List
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from resume_generator import ATSScorer, MarkdownFormatter, ResumeContent, ResumeSection
+from resume_generator.llm_utils import format_user_info
+from resume_generator.skill_matcher import default_matcher
+from resume_generator.token_normalizer import default_normalizer
+
+DEFAULT_SIZES = (1024, 10 * 1024, 100 * 1024, 1024 * 1024)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+VOCABULARY = (
+    "python aws docker kubernetes react javascript developed implemented managed led increased "
+    "improved achieved designed scalable cloud native microservices architecture team mentor "
+    "engineers pipelines testing performance reliability data processing machine learning agile "
+    "the and for with of to in on"
+).split()
+
+def synthetic_text(size: int, seed: int) -> str:
+    """Build markdown-like resume text of roughly ``size`` bytes."""
+    rng = random.Random(seed)
+    lines = ["## Experience", "## Education", "## Skills"]
+    length = sum(len(line) + 1 for line in lines)
+    while length < size:
+        words = rng.choices(VOCABULARY, k=rng.randint(6, 14))
+        line = f"- {' '.join(words).capitalize()} by {rng.randint(5, 95)}%"
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)[:size]
+
+def synthetic_resume(size: int, seed: int) -> ResumeContent:
+    """Build a ResumeContent whose rendered markdown is roughly ``size`` bytes."""
+    entries = max(1, size // 2048)
+    content = synthetic_text(max(64, size // (entries + 2)), seed)
+    return ResumeContent(
+        summary=content[:512],
+        experience=[ResumeSection(title=f"Engineer {i}", content=content) for i in range(entries)],
+        education=[ResumeSection(title="MSc Computer Science", content=content[:256])],
+        skills=VOCABULARY[:max(4, min(len(VOCABULARY), size // 256))],
+        ats_score=0.0
+    )
+
+def synthetic_user_info(size: int, seed: int) -> dict:
+    """Build a candidate profile whose formatted prompt is roughly ``size`` bytes."""
+    entries = max(1, size // 1024)
+    text = synthetic_text(max(64, size // (entries + 1)), seed)
+    return {
+        'personal_info': {
+            'full_name': 'Jane Doe', 'title': 'Engineer', 'location': 'Remote',
+            'email': 'jane@example.com', 'phone': '555-0100', 'linkedin': 'linkedin.com/in/jane'
+        },
+        'education': [{
+            'institution': 'Example University', 'degree': 'MSc', 'field': 'Computer Science',
+            'start_date': '2015-09-01', 'end_date': '2017-06-01', 'gpa': '3.9'
+        }],
+        'experience': [{
+            'company': f'Company {i}', 'job_title': 'Engineer', 'location': 'Remote',
+            'start_date': '2018-01-01', 'end_date': '2020-01-01',
+            'responsibilities': text, 'achievements': text[:256], 'tools': 'Python, AWS'
+        } for i in range(entries)],
+        'skills': {
+            'technical_skills': "\n".join(VOCABULARY), 'soft_skills': 'Leadership',
+            'languages': 'English', 'certifications': 'AWS Certified'
+        }
+    }
+
+def synthetic_job_analysis(size: int) -> dict:
+    """Build a job analysis dict with roughly ``size`` bytes of entries."""
+    count = max(1, size // 64)
+    return {
+        'required_skills': [f"{VOCABULARY[i % len(VOCABULARY)]} {i}" for i in range(count)],
+        'preferred_qualifications': [f"qualification {i}" for i in range(count)],
+        'key_responsibilities': [f"responsibility {i}" for i in range(count)],
+        'industry_keywords': VOCABULARY
+    }
+
+CALIBRATION_TEXT = synthetic_text(4096, seed=0)
+
+def calibration():
+    """Fixed workload with the scorer's mix of string, dict and sort operations."""
+    counts = {}
+    for word in CALIBRATION_TEXT.lower().split():
+        counts[word] = counts.get(word, 0) + 1
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+def ops_per_sec(operation: Callable[[], object], min_time: float) -> float:
+    """Throughput of one timed round of at least ``min_time`` seconds."""
+    runs = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time or runs < 3:
+        operation()
+        runs += 1
+        elapsed = time.perf_counter() - start
+    return runs / elapsed
+
+def measure(operation: Callable[[], object], min_time: float, rounds: int = 5) -> Dict[str, float]:
+    """Return operations per second, speed relative to the calibration loop and peak traced memory.
+    
+    Rounds of the operation alternate with rounds of the calibration loop,
+    so both see the same machine state; the relative speed is the median
+    of the per-round ratios.
+    """
+    tracemalloc.start()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    round_time = max(min_time / rounds, 0.01)
+    speeds, ratios = [], []
+    for _ in range(rounds):
+        speed = ops_per_sec(operation, round_time)
+        speeds.append(speed)
+        ratios.append(speed / ops_per_sec(calibration, round_time))
+    return {'ops_per_sec': statistics.median(speeds), 'relative': statistics.median(ratios), 'peak_bytes': peak}
+
+def benchmarks(sizes: List[int]) -> Dict[str, Callable[[], object]]:
+    """Build the named benchmark operations for every input size."""
+    scorer = ATSScorer()
+    phrase_scorer = ATSScorer(phrase_matcher=default_matcher())
+    normalized_scorer = ATSScorer(normalizer=default_normalizer())
+    cases = {}
+    for size in sizes:
+        resume_text = synthetic_text(size, seed=1)
+        job_description = synthetic_text(min(size, 16 * 1024), seed=2)
+        resume = synthetic_resume(size, seed=3)
+        user_info = synthetic_user_info(size, seed=4)
+        analysis = synthetic_job_analysis(size)
+        label = f"{size // 1024}KB"
+        cases.update({
+            f"extract_keywords[{label}]": lambda t=resume_text: scorer.extract_keywords(t),
+            f"extract_keywords_phrases[{label}]": lambda t=resume_text: phrase_scorer.extract_keywords(t),
+            f"extract_keywords_normalized[{label}]": lambda t=resume_text: normalized_scorer.extract_keywords(t),
+            f"calculate_ats_score[{label}]": lambda t=resume_text, j=job_description: scorer.calculate_ats_score(t, j),
+            f"get_improvement_suggestions[{label}]": lambda t=resume_text, j=job_description: scorer.get_improvement_suggestions(t, j),
+            f"format_resume[{label}]": lambda r=resume: MarkdownFormatter.format_resume(r),
+            f"format_skills[{label}]": lambda s=resume.skills * max(1, size // 1024): MarkdownFormatter.format_skills(s),
+            f"format_job_analysis[{label}]": lambda a=analysis: MarkdownFormatter.format_job_analysis(a),
+            f"format_user_info[{label}]": lambda u=user_info: format_user_info(u),
+        })
+    return cases
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Return a description of every benchmark that regressed beyond the threshold."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None or 'relative' not in reference:
+            continue
+        if result['relative'] < reference['relative'] * (1 - threshold):
+            regressions.append(
+                f"{name}: {result['relative']:.4g}x calibration vs baseline {reference['relative']:.4g}x"
+            )
+        if result['peak_bytes'] > reference['peak_bytes'] * (1 + threshold):
+            regressions.append(
+                f"{name}: peak {result['peak_bytes'] / 1024:.1f} KiB vs baseline {reference['peak_bytes'] / 1024:.1f} KiB"
+            )
+    return regressions
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the scorer, formatter and prompt construction.")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed slowdown or memory growth (fraction)")
+    parser.add_argument('--sizes', default=",".join(str(s) for s in DEFAULT_SIZES), help="Comma-separated input sizes in bytes")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Minimum seconds to run each benchmark")
+    parser.add_argument('--update-baseline', action='store_true', help="Write the results as the new baseline")
+    parser.add_argument('--allow-missing-baseline', action='store_true', help="Pass when there is no baseline to compare against")
+    args = parser.parse_args(argv)
+    
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {}
+    for name, operation in benchmarks(sizes).items():
+        results[name] = measure(operation, args.min_time)
+        print(f"{name:40s} {results[name]['ops_per_sec']:12.1f} ops/s {results[name]['relative']:10.4g}x {results[name]['peak_bytes'] / 1024:10.1f} KiB peak")
+    
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0 if args.allow_missing_baseline else 1
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+from typing import List, Tuple
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+FORBIDDEN_MODULES = ('langchain', 'langchain_core', 'langchain_groq', 'groq')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import resume_generator
+resume_generator.ATSScorer
+resume_generator.MarkdownFormatter
+elapsed = time.perf_counter() - start
+loaded = sorted(name for name in {FORBIDDEN_MODULES!r} if name in sys.modules)
+print(json.dumps({{'seconds': elapsed, 'loaded': loaded}}))
+"""
+
+def measure_import(repeat: int) -> Tuple[List[float], List[str]]:
+    """Time the scoring-only import in ``repeat`` fresh interpreters."""
+    env = dict(os.environ)
+    env.pop('GROQ_API_KEY', None)
+    samples, loaded = [], set()
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result['seconds'])
+        loaded.update(result['loaded'])
+    return samples, sorted(loaded)
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the scoring-only import time.")
+    parser.add_argument('--limit', type=float, default=1.0, help="Maximum median import time in seconds")
+    parser.add_argument('--repeat', type=int, default=5, help="Number of fresh interpreters to sample")
+    args = parser.parse_args(argv)
+    
+    samples, loaded = measure_import(args.repeat)
+    median = statistics.median(samples)
+    print(f"{'import resume_generator (scoring)':40s} {median * 1000:10.1f} ms median {min(samples) * 1000:10.1f} ms min")
+    
+    failures = []
+    if loaded:
+        failures.append(f"LLM modules loaded by a scoring-only import: {', '.join(loaded)}")
+    if median > args.limit:
+        failures.append(f"median import time {median:.3f}s exceeds {args.limit:.3f}s")
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
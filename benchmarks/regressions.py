@@ -0,0 +1,101 @@
+from typing import Callable, Dict, List
+import argparse
+import json
+import sys
+from langchain_core.exceptions import OutputParserException
+from resume_generator.output_repair import StructuredOutputParser, load_repaired_json
+from resume_generator.models import ResumeContent
+from resume_generator.streaming import ResumeStreamParser
+from resume_generator.exporter import _markdown_to_html
+
+# Malformed completion -> the object it must repair to
+REPAIRS = [
+    ('{"summary": "x", é}', {'summary': 'x'}),
+    ('{"skills": ["a", Français, "b"]}', {'skills': ['a']}),
+    ('{"summary": "x", "skills": ["Python",]}', {'summary': 'x', 'skills': ['Python']}),
+    ('{"summary": "x", "ok": True, "none": None', {'summary': 'x', 'ok': True, 'none': None}),
+]
+
+# Streamed completion -> the (field, index) events it must emit, without raising
+STREAMS = [
+    ('{"summary": "s", "skills": [Français, "b"], "ats_score": 1}',
+     [('summary', None), ('skills', 1), ('ats_score', None)]),
+    ('{"summary": "s", ü, "skills": ["a"]}', [('summary', None), ('skills', 0), ('skills', None)]),
+]
+
+# Resume markdown -> text the exported HTML must not contain, and text it must contain
+EXPORTS = [
+    ('[a](javascript:alert(1))', 'javascript:', '<a>a</a>'),
+    ('![x](JaVaScript:alert(1))', 'alert', '<img alt="x" />'),
+    ('[a](&#106;avascript:alert(1))', 'avascript', '<a>a</a>'),
+    ('[a](data:text/html,x)', 'data:', '<a>a</a>'),
+    ('Great <script>alert(1)</script>', '<script>', '&lt;script&gt;'),
+    ('[site](https://example.com/a:b)', 'javascript', 'href="https://example.com/a:b"'),
+    ('[mail](mailto:jane@example.com)', 'javascript', 'href="mailto:jane@example.com"'),
+]
+
+def check_repairs() -> List[str]:
+    """Malformed completions are repaired or rejected with ``OutputParserException``, never a crash."""
+    parser = StructuredOutputParser(ResumeContent)
+    failures = []
+    for text, expected in REPAIRS:
+        try:
+            actual = load_repaired_json(text)
+        except ValueError:
+            actual = None
+        except Exception as exc:
+            failures.append(f"{text!r} raised {type(exc).__name__}: {exc}")
+            continue
+        if actual != expected:
+            failures.append(f"{text!r} -> {json.dumps(actual)}, expected {json.dumps(expected)}")
+        try:
+            parser.parse(text)
+        except OutputParserException:
+            pass
+        except Exception as exc:
+            failures.append(f"{text!r} raised {type(exc).__name__} from the parser")
+    return failures
+
+def check_streams() -> List[str]:
+    """The stream parser skips values it cannot decode instead of raising."""
+    failures = []
+    for text, expected in STREAMS:
+        try:
+            events = [(field, index) for field, index, _ in ResumeStreamParser().feed(text)]
+        except Exception as exc:
+            failures.append(f"{text!r} raised {type(exc).__name__}: {exc}")
+            continue
+        if events != expected:
+            failures.append(f"{text!r} -> {events}, expected {expected}")
+    return failures
+
+def check_exports() -> List[str]:
+    """Exported HTML keeps no raw HTML and no link or image URL outside http, https and mailto."""
+    failures = []
+    for text, forbidden, required in EXPORTS:
+        output = _markdown_to_html(text)
+        if forbidden in output or required not in output:
+            failures.append(f"{text!r} -> {output!r}")
+    return failures
+
+CHECKS: Dict[str, Callable[[], List[str]]] = {
+    'output repair': check_repairs,
+    'stream parser': check_streams,
+    'export html': check_exports,
+}
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run table checks for previously broken inputs.")
+    parser.parse_args(argv)
+    
+    failed = 0
+    for name, check in CHECKS.items():
+        failures = check()
+        failed += len(failures)
+        print(f"{name:40s} {len(failures):10d} failures")
+        for failure in failures:
+            print(f"MISMATCH {failure}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+from typing import Dict, List
+import argparse
+import sys
+from resume_generator.token_normalizer import default_normalizer
+
+# Match key -> words that must normalize to it
+STEMS: Dict[str, List[str]] = {
+    'develop': ['develop', 'developed', 'developing', 'development', 'develops'],
+    'integr': ['integrate', 'integrated', 'integrating', 'integration', 'integrator'],
+    'cre': ['create', 'created', 'creating', 'creation', 'creator'],
+    'oper': ['operate', 'operated', 'operating', 'operations', 'operator', 'operators', 'ops'],
+    'manag': ['manage', 'managed', 'managing', 'management', 'mgmt'],
+    'organiz': ['organize', 'organized', 'organization'],
+    'deploy': ['deploy', 'deployed', 'deploying', 'deployment', 'deploys'],
+    'study': ['study', 'studies', 'studied'],
+    'tool': ['tool', 'tools'],
+    'kubernet': ['kubernetes', 'k8s'],
+    'databas': ['database', 'databases', 'db'],
+    'api': ['api', 'apis'],
+    'job': ['job', 'jobs'],
+    'bug': ['bug', 'bugs'],
+    'log': ['log', 'logs'],
+    'use': ['use', 'uses'],
+    'team': ['team', 'teams'],
+    'news': ['news'],
+    'new': ['new'],
+    'bus': ['bus'],
+    'plus': ['plus'],
+    'series': ['series'],
+    'status': ['status'],
+    'analysis': ['analysis'],
+    'success': ['success'],
+    'stat': ['state'],
+    'station': ['station'],
+}
+
+def check(stems: Dict[str, List[str]]) -> List[str]:
+    """Return a description of every word that does not normalize to its listed key."""
+    normalizer = default_normalizer()
+    failures = []
+    for key, words in stems.items():
+        for word in words:
+            actual = normalizer.normalize(word)
+            if actual != key:
+                failures.append(f"{word!r} -> {actual!r}, expected {key!r}")
+    return failures
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the keyword stemmer against a table of examples.")
+    parser.parse_args(argv)
+    
+    failures = check(STEMS)
+    print(f"{'stem table':40s} {sum(len(words) for words in STEMS.values()):10d} words {len(failures):10d} failures")
+    for failure in failures:
+        print(f"MISMATCH {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
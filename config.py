@@ -10,9 +10,18 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     
     # LLM Settings
+    LLM_BACKEND: str = "groq"
+    STUB_LLM_LATENCY: float = 0.0
     MODEL_NAME: str = "meta-llama/llama-4-scout-17b-16e-instruct"
     TEMPERATURE: float = 0.7
     MAX_TOKENS: int = 2000
+    LLM_REQUEST_TIMEOUT: float = 60.0
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    PROMPT_TOKEN_BUDGET: int = 0
+    LLM_FALLBACK_MODELS: str = ""
+    LLM_JSON_MODE: bool = True
+    LLM_HEDGE_REQUESTS: bool = False
     
     # Application Settings
     APP_NAME: str = "AI Resume Builder"
@@ -20,16 +29,50 @@ class Settings(BaseSettings):
     
     # ATS Scoring Settings
     MIN_ATS_SCORE: int = 70
+    BEST_OF_TEMPERATURES: str = "0.3,0.7,1.0"
     KEYWORD_WEIGHT: float = 0.4
     FORMAT_WEIGHT: float = 0.3
     CONTENT_WEIGHT: float = 0.3
     
+    # Instrumentation Settings
+    INSTRUMENTATION_ENABLED: bool = False
+    
+    # API Settings
+    API_MAX_CONCURRENT_LLM: int = 16
+    API_MAX_CONCURRENT_SCORING: int = 8
+    API_MAX_QUEUED: int = 64
+    
+    # Batch Settings
+    BATCH_WORKERS: int = 4
+    BATCH_MAX_RETRIES: int = 3
+    
+    # Rate Limit Settings (0 = unlimited)
+    LLM_REQUESTS_PER_MINUTE: int = 0
+    LLM_TOKENS_PER_MINUTE: int = 0
+    LLM_RATE_LIMIT_PATH: str = ""
+    LLM_RATE_LIMIT_MAX_WAIT: float = 120.0
+    
+    # Job Profile Settings
+    JOB_PROFILE_PATH: str = ""
+    JOB_PROFILE_CACHE_SIZE: int = 1024
+    
+    # Resume Store Settings
+    RESUME_STORE_PATH: str = "resumes.db"
+    
+    # LLM Cache Settings
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_SIZE: int = 256
+    LLM_CACHE_PATH: str = ""
+    LLM_CACHE_TTL: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    
     class Config:
         env_file = ".env"
 
 # Create global settings instance
 settings = Settings()
 
-# Validate required settings
-if not settings.GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY environment variable is required") 
\ No newline at end of file
+def require_groq_api_key():
+    """Validate the Groq API key; called on first LLM use rather than at import."""
+    if not settings.GROQ_API_KEY:
+        raise ValueError("GROQ_API_KEY environment variable is required") 
\ No newline at end of file
@@ -1,12 +1,34 @@
-from .llm_utils import ResumeContent, ResumeSection, generate_resume, analyze_job_description
-from .ats_scorer import ATSScorer
-from .markdown_formatter import MarkdownFormatter
-
-__all__ = [
-    'ResumeContent',
-    'ResumeSection',
-    'generate_resume',
-    'analyze_job_description',
-    'ATSScorer',
-    'MarkdownFormatter'
-] 
\ No newline at end of file
+from importlib import import_module
+
+# Public names and the submodule defining each. Submodules are imported on
+# first attribute access so scoring and formatting never load the LLM stack.
+_EXPORTS = {
+    'ResumeContent': 'models',
+    'ResumeSection': 'models',
+    'JobAnalysis': 'models',
+    'generate_resume': 'llm_utils',
+    'analyze_job_description': 'llm_utils',
+    'agenerate_resume': 'llm_utils',
+    'aanalyze_job_description': 'llm_utils',
+    'generate_best_resume': 'llm_utils',
+    'agenerate_best_resume': 'llm_utils',
+    'ATSScorer': 'ats_scorer',
+    'ScoreReport': 'ats_scorer',
+    'MarkdownFormatter': 'markdown_formatter',
+    'JobIndex': 'job_index',
+    'JobProfile': 'job_profile',
+    'JobProfileStore': 'job_profile',
+    'ResumeStore': 'resume_store'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
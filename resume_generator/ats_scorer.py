@@ -1,79 +1,154 @@
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, TYPE_CHECKING
 import re
 from collections import Counter
+from pydantic import BaseModel, Field
 from config import settings
+from .keyword_matrix import KeywordMatrix, match_counters
+from .skill_matcher import SkillMatcher
+from .token_normalizer import TokenNormalizer
+
+if TYPE_CHECKING:
+    from .job_profile import JobProfile
+from .instrumentation import instrumentation
+
+STOP_WORDS = frozenset({'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'with', 'by', 'of', 'a', 'an'})
+REQUIRED_SECTIONS = ('experience', 'education', 'skills')
+ACTION_VERBS = ('developed', 'created', 'implemented', 'managed', 'led', 'increased', 'improved', 'achieved')
+
+# Precompiled patterns shared by scoring and suggestions
+NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+BULLET_PATTERN = re.compile(r'[•\-\*]')
+SPACING_PATTERN = re.compile(r'\n{3,}')
+QUANTIFIED_PATTERN = re.compile(r'\d+%|\$\d+|\d+\s*(?:years?|months?|weeks?)')
+ACTION_VERB_PATTERN = re.compile('|'.join(ACTION_VERBS))
+
+class ScoreReport(BaseModel):
+    """Result of a single-pass ATS analysis."""
+    keyword_score: float = Field(description="Keyword match score (0-100)")
+    format_score: float = Field(description="Format compatibility score (0-100)")
+    content_score: float = Field(description="Content quality score (0-100)")
+    total_score: float = Field(description="Weighted ATS compatibility score (0-100)")
+    missing_keywords: List[str] = Field(description="Job keywords absent from the resume, in order of appearance")
+    suggestions: List[str] = Field(description="Suggestions for improving ATS compatibility")
 
 class ATSScorer:
-    def __init__(self):
+    def __init__(self, phrase_matcher: Optional[SkillMatcher] = None,
+                 normalizer: Optional[TokenNormalizer] = None):
+        """Create a scorer.
+        
+        With a ``phrase_matcher`` (e.g. ``skill_matcher.default_matcher()``),
+        skill phrases such as "machine learning", "CI/CD" or "C++" are
+        extracted as single canonical keywords before the remaining text is
+        split into words. With a ``normalizer`` (e.g.
+        ``token_normalizer.default_normalizer()``), words are mapped through
+        synonyms and a stemmer, so "developed" matches "development" and
+        "k8s" matches "kubernetes".
+        """
         self.keyword_weight = settings.KEYWORD_WEIGHT
         self.format_weight = settings.FORMAT_WEIGHT
         self.content_weight = settings.CONTENT_WEIGHT
+        self.phrase_matcher = phrase_matcher
+        self.normalizer = normalizer
 
     def extract_keywords(self, text: str) -> List[str]:
         """Extract keywords from text."""
-        # Convert to lowercase and remove special characters
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', ' ', text)
+        return self._keywords_from_lower(text.lower())
+
+    def _keywords_from_lower(self, text: str) -> List[str]:
+        """Extract keywords from text that is already lowercase."""
+        if self.phrase_matcher is not None:
+            return self._phrase_keywords(text)
+        return self._word_keywords(text)
+
+    def _word_keywords(self, text: str) -> List[str]:
+        # Remove special characters
+        text = NON_WORD_PATTERN.sub(' ', text)
         
         # Split into words and remove common stop words
         words = text.split()
-        stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'with', 'by', 'of', 'a', 'an'}
-        keywords = [word for word in words if word not in stop_words and len(word) > 2]
+        if self.normalizer is not None:
+            # Short words are kept when they are synonyms, e.g. "js"
+            normalize, synonyms = self.normalizer.normalize, self.normalizer.table
+            return [normalize(word) for word in words
+                    if word not in STOP_WORDS and (len(word) > 2 or word in synonyms)]
+        keywords = [word for word in words if word not in STOP_WORDS and len(word) > 2]
         
         return keywords
 
+    def _phrase_keywords(self, text: str) -> List[str]:
+        """Skill phrases and the words between them, in order of appearance."""
+        keywords = []
+        position = 0
+        for start, end, skill in self.phrase_matcher.find_all(text):
+            keywords.extend(self._word_keywords(text[position:start]))
+            keywords.append(skill)
+            position = end
+        keywords.extend(self._word_keywords(text[position:]))
+        return keywords
+
+    def display_keywords(self, keywords: List[str]) -> List[str]:
+        """Readable forms of keywords for reports; normalized keywords are match keys, not words."""
+        if self.normalizer is None:
+            return keywords
+        return [self.normalizer.display(keyword) for keyword in keywords]
+
+    def keyword_profile(self, text: str) -> Counter:
+        """Count the keywords of a text so it can be matched many times."""
+        return Counter(self.extract_keywords(text))
+
     def calculate_keyword_match(self, resume_keywords: List[str], job_keywords: List[str]) -> float:
         """Calculate the keyword match score."""
-        resume_counter = Counter(resume_keywords)
-        job_counter = Counter(job_keywords)
-        
-        # Calculate intersection of keywords
-        common_keywords = set(resume_counter.keys()) & set(job_counter.keys())
-        
-        if not job_keywords:
-            return 0.0
-        
-        # Calculate match score
-        match_score = sum(min(resume_counter[k], job_counter[k]) for k in common_keywords)
-        total_keywords = sum(job_counter.values())
+        return self.match_profiles(Counter(resume_keywords), Counter(job_keywords))
+
+    def match_profiles(self, resume_counter: Counter, job_counter: Counter) -> float:
+        """Calculate the keyword match score from precomputed keyword profiles."""
+        return match_counters(resume_counter, job_counter)
+
+    def scan_text(self, resume_text: str, resume_lower: str = None) -> Dict:
+        """Run every format and content check over the resume in one pass."""
+        if resume_lower is None:
+            resume_lower = resume_text.lower()
         
-        return (match_score / total_keywords) * 100
+        return {
+            'missing_sections': [section for section in REQUIRED_SECTIONS if section not in resume_lower],
+            'has_bullets': BULLET_PATTERN.search(resume_text) is not None,
+            'has_extra_spacing': SPACING_PATTERN.search(resume_text) is not None,
+            'has_action_verbs': ACTION_VERB_PATTERN.search(resume_lower) is not None,
+            'has_quantified': QUANTIFIED_PATTERN.search(resume_text) is not None,
+            'word_count': len(resume_text.split()),
+        }
 
-    def check_format_compatibility(self, resume_text: str) -> float:
-        """Check resume format compatibility."""
+    def _format_score(self, features: Dict) -> float:
+        """Score format compatibility from scanned features."""
         score = 100.0
         
         # Check for proper section headers
-        required_sections = ['experience', 'education', 'skills']
-        for section in required_sections:
-            if section.lower() not in resume_text.lower():
-                score -= 20
+        score -= 20 * len(features['missing_sections'])
         
         # Check for bullet points
-        if not re.search(r'[•\-\*]', resume_text):
+        if not features['has_bullets']:
             score -= 10
         
         # Check for proper spacing
-        if re.search(r'\n{3,}', resume_text):
+        if features['has_extra_spacing']:
             score -= 10
         
         return max(0, score)
 
-    def evaluate_content_quality(self, resume_text: str) -> float:
-        """Evaluate the quality of resume content."""
+    def _content_score(self, features: Dict) -> float:
+        """Score content quality from scanned features."""
         score = 100.0
         
         # Check for action verbs
-        action_verbs = {'developed', 'created', 'implemented', 'managed', 'led', 'increased', 'improved', 'achieved'}
-        if not any(verb in resume_text.lower() for verb in action_verbs):
+        if not features['has_action_verbs']:
             score -= 20
         
         # Check for quantified achievements
-        if not re.search(r'\d+%|\$\d+|\d+\s*(?:years?|months?|weeks?)', resume_text):
+        if not features['has_quantified']:
             score -= 20
         
         # Check for proper length
-        word_count = len(resume_text.split())
+        word_count = features['word_count']
         if word_count < 200:
             score -= 20
         elif word_count > 1000:
@@ -81,50 +156,185 @@ class ATSScorer:
         
         return max(0, score)
 
+    def check_format_compatibility(self, resume_text: str) -> float:
+        """Check resume format compatibility."""
+        return self._format_score(self.scan_text(resume_text))
+
+    def evaluate_content_quality(self, resume_text: str) -> float:
+        """Evaluate the quality of resume content."""
+        return self._content_score(self.scan_text(resume_text))
+
+    def combine_scores(self, keyword_score: float, format_score: float, content_score: float) -> float:
+        """Combine the individual scores into the weighted ATS score."""
+        total_score = (
+            keyword_score * self.keyword_weight +
+            format_score * self.format_weight +
+            content_score * self.content_weight
+        )
+        
+        return round(total_score, 2)
+
     def calculate_ats_score(self, resume_text: str, job_description: str) -> float:
         """Calculate the overall ATS compatibility score."""
+        with instrumentation.stage('ats_scoring'):
+            return self._calculate_ats_score(resume_text, job_description)
+
+    def _calculate_ats_score(self, resume_text: str, job_description: str) -> float:
         # Extract keywords
-        resume_keywords = self.extract_keywords(resume_text)
+        resume_lower = resume_text.lower()
+        resume_keywords = self._keywords_from_lower(resume_lower)
         job_keywords = self.extract_keywords(job_description)
+        features = self.scan_text(resume_text, resume_lower)
         
         # Calculate individual scores
         keyword_score = self.calculate_keyword_match(resume_keywords, job_keywords)
-        format_score = self.check_format_compatibility(resume_text)
-        content_score = self.evaluate_content_quality(resume_text)
+        format_score = self._format_score(features)
+        content_score = self._content_score(features)
         
         # Calculate weighted average
-        total_score = (
-            keyword_score * self.keyword_weight +
-            format_score * self.format_weight +
-            content_score * self.content_weight
+        return self.combine_scores(keyword_score, format_score, content_score)
+
+    def score_many(self, resume_text: str, job_descriptions: Iterable[str]) -> List[float]:
+        """Score one resume against many job descriptions.
+        
+        The resume is tokenized and checked once; each job description is
+        tokenized once. Scores are returned in the order of the job descriptions.
+        """
+        return self.score_grid([resume_text], job_descriptions)[0]
+
+    def score_resumes(self, resume_texts: Iterable[str], job_description: str) -> List[float]:
+        """Score many resumes against one job description."""
+        return [row[0] for row in self.score_grid(resume_texts, [job_description])]
+
+    def score_grid(self, resume_texts: Iterable[str], job_descriptions: Iterable[str]) -> List[List[float]]:
+        """Score every resume against every job description.
+        
+        Returns one row per resume with one score per job description. Each
+        document is tokenized exactly once and the job keyword profiles are
+        shared by all resumes.
+        """
+        return list(self.iter_score_grid(resume_texts, job_descriptions))
+
+    def iter_score_grid(self, resume_texts: Iterable[str], job_descriptions: Iterable[str],
+                        chunk_size: Optional[int] = None) -> Iterator[List[float]]:
+        """Yield one row of scores per resume against every job description.
+        
+        Keyword overlaps are computed on a sparse term matrix of the job
+        descriptions, one bounded chunk of resumes at a time, so large grids
+        can be streamed without holding every row in memory.
+        """
+        matrix = KeywordMatrix(self.keyword_profile(job) for job in job_descriptions)
+        chunk_size = chunk_size or matrix.resume_chunk_size()
+        
+        chunk = []
+        for resume_text in resume_texts:
+            chunk.append(self._resume_scores(resume_text))
+            if len(chunk) == chunk_size:
+                yield from self._score_chunk(matrix, chunk)
+                chunk = []
+        if chunk:
+            yield from self._score_chunk(matrix, chunk)
+
+    def _resume_scores(self, resume_text: str) -> Tuple[Counter, float, float]:
+        """Tokenize and check a resume once for batch scoring."""
+        resume_lower = resume_text.lower()
+        features = self.scan_text(resume_text, resume_lower)
+        return (
+            Counter(self._keywords_from_lower(resume_lower)),
+            self._format_score(features),
+            self._content_score(features)
         )
+
+    def _score_chunk(self, matrix: KeywordMatrix, chunk: List[Tuple[Counter, float, float]]) -> Iterator[List[float]]:
+        """Combine a chunk of keyword match rows with the per-resume scores."""
+        keyword_rows = matrix.match_block([profile for profile, _, _ in chunk])
+        if not isinstance(keyword_rows, list):
+            keyword_rows = keyword_rows.tolist()
+        for (_, format_score, content_score), keyword_row in zip(chunk, keyword_rows):
+            yield [self.combine_scores(keyword_score, format_score, content_score) for keyword_score in keyword_row]
+
+    def analyze(self, resume_text: str, job_description: str) -> ScoreReport:
+        """Score a resume and collect improvement suggestions in a single pass."""
+        with instrumentation.stage('ats_scoring'):
+            return self._analyze(resume_text, job_description)
+
+    def _analyze(self, resume_text: str, job_description: str) -> ScoreReport:
+        resume_lower = resume_text.lower()
+        resume_profile = Counter(self._keywords_from_lower(resume_lower))
+        job_keywords = self.extract_keywords(job_description)
+        job_profile = Counter(job_keywords)
+        features = self.scan_text(resume_text, resume_lower)
         
-        return round(total_score, 2)
+        # Calculate individual scores
+        keyword_score = self.match_profiles(resume_profile, job_profile)
+        format_score = self._format_score(features)
+        content_score = self._content_score(features)
+        
+        # Find missing keywords, keeping the order of the job description
+        missing_keywords = [k for k in dict.fromkeys(job_keywords) if k not in resume_profile]
+        missing_keywords = self.display_keywords(missing_keywords)
+        
+        return ScoreReport(
+            keyword_score=keyword_score,
+            format_score=format_score,
+            content_score=content_score,
+            total_score=self.combine_scores(keyword_score, format_score, content_score),
+            missing_keywords=missing_keywords,
+            suggestions=self._suggestions(missing_keywords, features)
+        )
 
-    def get_improvement_suggestions(self, resume_text: str, job_description: str) -> List[str]:
-        """Generate suggestions for improving ATS compatibility."""
-        suggestions = []
+    def analyze_profile(self, resume_text: str, profile: "JobProfile") -> ScoreReport:
+        """Score a resume against a prebuilt ``JobProfile`` without re-reading the posting.
         
-        # Extract keywords
-        resume_keywords = set(self.extract_keywords(resume_text))
-        job_keywords = set(self.extract_keywords(job_description))
+        Keyword matching uses the profile's weights, missing keywords are
+        ordered by weight, and required skills from the structured analysis
+        that the resume never mentions are suggested first.
+        """
+        with instrumentation.stage('ats_scoring'):
+            resume_lower = resume_text.lower()
+            resume_profile = Counter(self._keywords_from_lower(resume_lower))
+            features = self.scan_text(resume_text, resume_lower)
+            
+            keyword_score = profile.keyword_score(resume_profile)
+            format_score = self._format_score(features)
+            content_score = self._content_score(features)
+            missing_keywords = self.display_keywords(profile.missing_keywords(resume_profile))
+            
+            suggestions = self._suggestions(missing_keywords, features)
+            missing_skills = profile.missing_required_skills(resume_lower)
+            if missing_skills:
+                suggestions.insert(0, f"Highlight these required skills: {', '.join(missing_skills)}")
+            
+            return ScoreReport(
+                keyword_score=keyword_score,
+                format_score=format_score,
+                content_score=content_score,
+                total_score=self.combine_scores(keyword_score, format_score, content_score),
+                missing_keywords=missing_keywords,
+                suggestions=suggestions
+            )
+
+    def _suggestions(self, missing_keywords: List[str], features: Dict) -> List[str]:
+        """Build improvement suggestions from missing keywords and scanned features."""
+        suggestions = []
         
-        # Find missing keywords
-        missing_keywords = job_keywords - resume_keywords
         if missing_keywords:
             suggestions.append(f"Add these keywords from the job description: {', '.join(missing_keywords)}")
         
         # Check format
-        if not re.search(r'[•\-\*]', resume_text):
+        if not features['has_bullets']:
             suggestions.append("Use bullet points to improve readability")
         
         # Check for quantified achievements
-        if not re.search(r'\d+%|\$\d+|\d+\s*(?:years?|months?|weeks?)', resume_text):
+        if not features['has_quantified']:
             suggestions.append("Add quantified achievements with numbers and metrics")
         
         # Check for action verbs
-        action_verbs = {'developed', 'created', 'implemented', 'managed', 'led', 'increased', 'improved', 'achieved'}
-        if not any(verb in resume_text.lower() for verb in action_verbs):
+        if not features['has_action_verbs']:
             suggestions.append("Use strong action verbs to begin bullet points")
         
-        return suggestions 
\ No newline at end of file
+        return suggestions
+
+    def get_improvement_suggestions(self, resume_text: str, job_description: str) -> List[str]:
+        """Generate suggestions for improving ATS compatibility."""
+        return self.analyze(resume_text, job_description).suggestions 
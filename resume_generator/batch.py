@@ -0,0 +1,160 @@
+from typing import Dict, Iterator, Optional, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import groq
+import httpx
+from config import settings
+from .llm_utils import generate_resume
+from .ats_scorer import ATSScorer
+from .markdown_formatter import MarkdownFormatter
+from .rate_limiter import llm_priority
+
+TRANSIENT_ERRORS = (
+    groq.APIConnectionError,
+    groq.APITimeoutError,
+    groq.RateLimitError,
+    groq.InternalServerError,
+    httpx.TransportError,
+    ConnectionError,
+    TimeoutError,  # includes RateLimitTimeout
+)
+
+def is_transient(exc: Exception) -> bool:
+    """Return True for failures that are worth retrying."""
+    return isinstance(exc, TRANSIENT_ERRORS)
+
+def read_jobs(path: str) -> Iterator[Tuple[str, Optional[Dict], Optional[str]]]:
+    """Yield (job id, job, error) triples from a JSONL file; ids default to the line number.
+    
+    A line that is not a JSON object yields no job and the reason as ``error``.
+    """
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            job_id = f"line-{line_number}"
+            try:
+                job = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield job_id, None, f"JSONDecodeError: {exc}"
+                continue
+            if not isinstance(job, dict):
+                yield job_id, None, f"Expected a JSON object, got {type(job).__name__}"
+                continue
+            yield str(job.get('id', job_id)), job, None
+
+def read_completed(path: str) -> Set[str]:
+    """Return the ids of jobs with a successful result in an output file."""
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line from an interrupted run
+                continue
+            if result.get('status') == 'ok':
+                completed.add(result['id'])
+    return completed
+
+def process_job(job_id: str, job: Dict, scorer: ATSScorer, max_retries: int = 3,
+                backoff: float = 1.0, max_backoff: float = 60.0) -> Dict:
+    """Generate and score one resume, retrying transient failures with backoff."""
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            # Batch jobs yield the shared rate budget to interactive requests
+            with llm_priority('batch'):
+                resume = generate_resume(job_description=job['job_description'], user_info=job['user_info'])
+            report = scorer.analyze(MarkdownFormatter.format_resume(resume), job['job_description'])
+            return {
+                'id': job_id,
+                'status': 'ok',
+                'resume': resume.model_dump(),
+                'ats_score': report.total_score,
+                'suggestions': report.suggestions,
+                'attempts': attempt,
+                'elapsed': round(time.perf_counter() - start, 3)
+            }
+        except Exception as exc:
+            if attempt > max_retries or not is_transient(exc):
+                return {
+                    'id': job_id,
+                    'status': 'error',
+                    'error': f"{type(exc).__name__}: {exc}",
+                    'attempts': attempt,
+                    'elapsed': round(time.perf_counter() - start, 3)
+                }
+            # Exponential backoff with jitter
+            delay = min(max_backoff, backoff * 2 ** (attempt - 1))
+            time.sleep(delay * (0.5 + random.random() / 2))
+
+def run_batch(input_path: str, output_path: str, workers: int = 4, max_retries: int = 3,
+              backoff: float = 1.0, sync_every: int = 100) -> Dict[str, int]:
+    """Run every unfinished job in ``input_path`` and append results to ``output_path``.
+    
+    At most ``2 * workers`` jobs are in flight at a time, so memory stays
+    bounded regardless of the input size. Returns counts of skipped, succeeded
+    and failed jobs.
+    """
+    completed = read_completed(output_path)
+    scorer = ATSScorer()
+    counts = {'skipped': 0, 'ok': 0, 'error': 0}
+    pending = set()
+    
+    with open(output_path, 'a', encoding='utf-8') as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        def record(result):
+            counts[result['status']] += 1
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+            if (counts['ok'] + counts['error']) % sync_every == 0:
+                os.fsync(out.fileno())
+        
+        def drain(return_when):
+            nonlocal pending
+            done, pending = wait(pending, return_when=return_when)
+            for future in done:
+                record(future.result())
+        
+        for job_id, job, error in read_jobs(input_path):
+            if job_id in completed:
+                counts['skipped'] += 1
+                continue
+            if error is not None:
+                # A malformed line fails on its own; the rest of the run continues
+                record({'id': job_id, 'status': 'error', 'error': error, 'attempts': 0, 'elapsed': 0.0})
+                continue
+            completed.add(job_id)
+            pending.add(pool.submit(process_job, job_id, job, scorer, max_retries, backoff))
+            if len(pending) >= 2 * workers:
+                drain(FIRST_COMPLETED)
+        while pending:
+            drain(FIRST_COMPLETED)
+        os.fsync(out.fileno())
+    
+    return counts
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate and score resumes in bulk from a JSONL file.")
+    parser.add_argument('input', help="JSONL file of {id, user_info, job_description} jobs")
+    parser.add_argument('output', help="JSONL file results are appended to; also used as the checkpoint")
+    parser.add_argument('--workers', type=int, default=settings.BATCH_WORKERS, help="Concurrent jobs")
+    parser.add_argument('--max-retries', type=int, default=settings.BATCH_MAX_RETRIES, help="Retries per job for transient failures")
+    parser.add_argument('--backoff', type=float, default=1.0, help="Initial retry delay in seconds")
+    args = parser.parse_args(argv)
+    
+    counts = run_batch(args.input, args.output, workers=args.workers, max_retries=args.max_retries, backoff=args.backoff)
+    print(f"{counts['ok']} succeeded, {counts['error']} failed, {counts['skipped']} already done")
+    return 1 if counts['error'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
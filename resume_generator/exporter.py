@@ -0,0 +1,251 @@
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+from string import Template
+import argparse
+import html
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import markdown
+from markdown.treeprocessors import Treeprocessor
+from .models import ResumeContent
+from .markdown_formatter import MarkdownFormatter
+from .llm_cache import MemoryCache
+from .memo import content_hash
+
+FORMATS = {'markdown': '.md', 'html': '.html', 'pdf': '.pdf'}
+
+HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+body { font-family: Helvetica, Arial, sans-serif; font-size: 11pt; line-height: 1.4; max-width: 48em; margin: 2em auto; color: #222; }
+h2 { font-size: 14pt; border-bottom: 1px solid #999; margin-top: 1.2em; }
+h3 { font-size: 12pt; margin-bottom: 0.2em; }
+ul { margin-top: 0.2em; padding-left: 1.2em; }
+@page { size: A4; margin: 1.5cm; }
+</style>
+</head>
+<body>
+$body
+</body>
+</html>
+""")
+
+SAFE_NAME_PATTERN = re.compile(r'[^\w.-]')
+# Link and image URLs keep these schemes; relative URLs are kept too
+SAFE_URL_SCHEMES = ('http', 'https', 'mailto')
+URL_HEAD_PATTERN = re.compile(r'[/?#]')
+URL_IGNORED_PATTERN = re.compile(r'[\x00-\x20]')
+
+_local = threading.local()
+
+def _safe_url(url: str) -> bool:
+    # Browsers decode entities and ignore whitespace and control characters in URLs
+    url = URL_IGNORED_PATTERN.sub('', html.unescape(url))
+    head = URL_HEAD_PATTERN.split(url, 1)[0]
+    if ':' not in head:
+        return True
+    return head.split(':', 1)[0].strip().lower() in SAFE_URL_SCHEMES
+
+class _SafeLinks(Treeprocessor):
+    """Drops link and image URLs with schemes outside ``SAFE_URL_SCHEMES``."""
+
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ('href', 'src'):
+                url = element.get(attribute)
+                if url is not None and not _safe_url(url):
+                    del element.attrib[attribute]
+
+def _markdown_to_html(text: str) -> str:
+    """Convert markdown with a reusable per-thread converter.
+    
+    Raw HTML in the text is escaped rather than passed through, and links
+    other than http, https and mailto lose their URL, since resume content
+    comes from the LLM.
+    """
+    converter = getattr(_local, 'converter', None)
+    if converter is None:
+        converter = markdown.Markdown(extensions=['extra'])
+        converter.preprocessors.deregister('html_block')
+        converter.inlinePatterns.deregister('html')
+        converter.treeprocessors.register(_SafeLinks(converter), 'safe_links', 5)
+        _local.converter = converter
+    return converter.reset().convert(text)
+
+def export_filename(resume_id: str) -> str:
+    """A file name for a resume id, without the extension.
+    
+    Ids that need sanitizing get a short hash of the original id appended,
+    so "a/b" and "a?b" do not both become "a_b".
+    """
+    name = SAFE_NAME_PATTERN.sub('_', resume_id)
+    if name != resume_id:
+        name += '-' + content_hash(resume_id)[:8]
+    return name
+
+@lru_cache(maxsize=None)
+def pdf_backend() -> Optional[str]:
+    """The available PDF renderer: 'weasyprint', 'wkhtmltopdf' or None."""
+    try:
+        import weasyprint  # noqa: F401
+        return 'weasyprint'
+    except (ImportError, OSError):
+        pass
+    if shutil.which('wkhtmltopdf'):
+        return 'wkhtmltopdf'
+    return None
+
+def html_to_pdf(html: str) -> bytes:
+    """Render an HTML document to PDF with the available backend."""
+    backend = pdf_backend()
+    if backend == 'weasyprint':
+        import weasyprint
+        return weasyprint.HTML(string=html).write_pdf()
+    if backend == 'wkhtmltopdf':
+        return subprocess.run(
+            ['wkhtmltopdf', '--quiet', '--encoding', 'utf-8', '-', '-'],
+            input=html.encode('utf-8'), capture_output=True, check=True
+        ).stdout
+    raise RuntimeError("PDF export needs WeasyPrint or wkhtmltopdf to be installed")
+
+class ResumeExporter:
+    """Renders resumes to export formats, caching output by content hash."""
+
+    def __init__(self, cache_size: int = 256, title: str = "Resume"):
+        self.title = title
+        self.cache = MemoryCache(cache_size)
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, resume: ResumeContent, fmt: str = 'html') -> bytes:
+        """Render a resume as ``markdown``, ``html`` or ``pdf`` bytes."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}', expected one of {tuple(FORMATS)}")
+        key = content_hash(fmt, self.title, resume)
+        output = self.cache.get(key)
+        if output is not None:
+            self.hits += 1
+            return output
+        self.misses += 1
+        
+        resume_markdown = MarkdownFormatter.format_resume(resume)
+        if fmt == 'markdown':
+            output = resume_markdown.encode('utf-8')
+        else:
+            html = self.to_html(resume_markdown)
+            output = html.encode('utf-8') if fmt == 'html' else html_to_pdf(html)
+        self.cache.set(key, output)
+        return output
+
+    def to_html(self, resume_markdown: str) -> str:
+        """Wrap rendered resume markdown in the HTML template."""
+        return HTML_TEMPLATE.substitute(title=html.escape(self.title), body=_markdown_to_html(resume_markdown))
+
+# Per-process exporter used by bulk export workers
+_exporter = None
+
+def _export_one(resume: Dict, fmt: str, path: str) -> int:
+    """Render one resume and write it atomically; runs in a worker process."""
+    global _exporter
+    if _exporter is None:
+        _exporter = ResumeExporter()
+    output = _exporter.render(ResumeContent(**resume), fmt)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(output)
+    os.replace(tmp_path, path)
+    return len(output)
+
+def read_resumes(path: str) -> Iterator[Tuple[str, Dict]]:
+    """Yield ``(id, resume)`` for every successful result in a batch output file."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if result.get('status', 'ok') == 'ok' and 'resume' in result:
+                yield str(result['id']), result['resume']
+
+def export_many(resumes: Iterable[Tuple[str, Dict]], output_dir: str, fmt: str = 'html',
+                workers: Optional[int] = None) -> Dict[str, int]:
+    """Export ``(id, resume)`` pairs to ``output_dir/<id><ext>`` across a process pool.
+    
+    File names come from ``export_filename``. At most ``2 * workers`` resumes
+    are in flight at a time. Resumes with identical content are rendered once
+    and copied for the other ids. Returns counts of rendered, deduplicated and failed exports.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {tuple(FORMATS)}")
+    if fmt == 'pdf' and pdf_backend() is None:
+        raise RuntimeError("PDF export needs WeasyPrint or wkhtmltopdf to be installed")
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    counts = {'rendered': 0, 'deduplicated': 0, 'error': 0}
+    # Content hash -> path of the rendered file, once written
+    written: Dict[str, str] = {}
+    # Content hash -> paths waiting for the file to be rendered
+    duplicates: Dict[str, list] = {}
+    pending = {}
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def drain(return_when):
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                digest, path = pending.pop(future)
+                waiting = duplicates.pop(digest, [])
+                if future.exception() is not None:
+                    counts['error'] += 1 + len(waiting)
+                    continue
+                counts['rendered'] += 1
+                written[digest] = path
+                for copy_path in waiting:
+                    if copy_path != path:
+                        shutil.copyfile(path, copy_path)
+                    counts['deduplicated'] += 1
+        
+        for resume_id, resume in resumes:
+            path = os.path.join(output_dir, export_filename(resume_id) + FORMATS[fmt])
+            digest = content_hash(resume)
+            if digest in written:
+                if written[digest] != path:
+                    shutil.copyfile(written[digest], path)
+                counts['deduplicated'] += 1
+                continue
+            if digest in duplicates:
+                duplicates[digest].append(path)
+                continue
+            duplicates[digest] = []
+            pending[pool.submit(_export_one, resume, fmt, path)] = (digest, path)
+            if len(pending) >= 2 * workers:
+                drain(FIRST_COMPLETED)
+        while pending:
+            drain(FIRST_COMPLETED)
+    
+    return counts
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export generated resumes to Markdown, HTML or PDF.")
+    parser.add_argument('input', help="JSONL results written by resume_generator.batch")
+    parser.add_argument('output_dir', help="Directory the exported files are written to")
+    parser.add_argument('--format', choices=tuple(FORMATS), default='html', help="Export format")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    
+    counts = export_many(read_resumes(args.input), args.output_dir, fmt=args.format, workers=args.workers)
+    print(f"{counts['rendered']} rendered, {counts['deduplicated']} deduplicated, {counts['error']} failed")
+    return 1 if counts['error'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+from typing import Dict, List, Optional
+from collections import Counter
+from .ats_scorer import (
+    ATSScorer,
+    ScoreReport,
+    REQUIRED_SECTIONS,
+    BULLET_PATTERN,
+    SPACING_PATTERN,
+    QUANTIFIED_PATTERN,
+    ACTION_VERB_PATTERN
+)
+from .models import ResumeContent
+from .markdown_formatter import MarkdownFormatter
+
+# Characters kept from each end of a section to catch matches spanning sections
+BOUNDARY_WINDOW = 64
+
+class _Section:
+    """Resident state of one resume section."""
+
+    def __init__(self, text: str, scorer: ATSScorer):
+        lower = text.lower()
+        self.text = text
+        self.lower = lower
+        self.keywords = Counter(scorer._keywords_from_lower(lower))
+        self.sections = {section for section in REQUIRED_SECTIONS if section in lower}
+        self.has_bullets = BULLET_PATTERN.search(text) is not None
+        self.has_extra_spacing = SPACING_PATTERN.search(text) is not None
+        self.has_action_verbs = ACTION_VERB_PATTERN.search(lower) is not None
+        self.has_quantified = QUANTIFIED_PATTERN.search(text) is not None
+        self.word_count = len(text.split())
+
+    def edges(self, text: str) -> str:
+        """The text itself if short, otherwise its head and tail split by a separator no pattern matches."""
+        if len(text) <= 2 * BOUNDARY_WINDOW:
+            return text
+        return text[:BOUNDARY_WINDOW] + "\x00" + text[-BOUNDARY_WINDOW:]
+
+class IncrementalATSScorer:
+    """Live ATS scoring for a resume edited one section at a time.
+    
+    The resume is an ordered set of named sections whose concatenation is the
+    resume text. Per-section keyword counters, format/content features and the
+    job's keyword profile stay resident, so ``set_section`` only applies the
+    edited section's token delta to the running keyword overlap and re-runs the
+    checks on that section. Matches that span section boundaries are checked
+    on a small skeleton of section edges. Scores equal
+    ``ATSScorer.calculate_ats_score`` on the concatenated text, provided each
+    section ends with whitespace (as ``MarkdownFormatter`` sections do) and no
+    cross-section match is longer than the boundary window.
+    """
+
+    def __init__(self, job_description: str, scorer: Optional[ATSScorer] = None):
+        self.scorer = scorer or ATSScorer()
+        job_keywords = self.scorer.extract_keywords(job_description)
+        self.job_keywords = Counter(job_keywords)
+        self.job_order = list(dict.fromkeys(job_keywords))
+        self.job_total = len(job_keywords)
+        self.resume_keywords: Counter = Counter()
+        self.match_count = 0
+        self.sections: Dict[str, _Section] = {}
+
+    @classmethod
+    def from_resume(cls, resume: ResumeContent, job_description: str,
+                    scorer: Optional[ATSScorer] = None) -> "IncrementalATSScorer":
+        """Build a scorer whose sections mirror ``MarkdownFormatter.format_resume``."""
+        incremental = cls(job_description, scorer)
+        incremental.set_section('summary', MarkdownFormatter.format_summary(resume.summary))
+        for i, exp in enumerate(resume.experience):
+            incremental.set_section(f'experience-{i}', MarkdownFormatter.format_section(exp))
+        for i, edu in enumerate(resume.education):
+            incremental.set_section(f'education-{i}', MarkdownFormatter.format_section(edu))
+        incremental.set_section('skills', MarkdownFormatter.format_skills(resume.skills))
+        return incremental
+
+    @property
+    def resume_text(self) -> str:
+        return "".join(section.text for section in self.sections.values())
+
+    def set_section(self, name: str, text: str):
+        """Add or replace a section; new sections are appended at the end."""
+        old = self.sections.get(name)
+        new = _Section(text, self.scorer)
+        self._apply_delta(old.keywords if old else Counter(), new.keywords)
+        self.sections[name] = new
+
+    def remove_section(self, name: str):
+        """Remove a section from the resume."""
+        old = self.sections.pop(name)
+        self._apply_delta(old.keywords, Counter())
+
+    def _apply_delta(self, old: Counter, new: Counter):
+        """Update the resume counter and the running min-count overlap."""
+        job = self.job_keywords
+        resume = self.resume_keywords
+        for token in old.keys() | new.keys():
+            delta = new.get(token, 0) - old.get(token, 0)
+            if not delta:
+                continue
+            before = resume[token]
+            after = before + delta
+            if after:
+                resume[token] = after
+            else:
+                del resume[token]
+            if token in job:
+                self.match_count += min(after, job[token]) - min(before, job[token])
+
+    def keyword_score(self) -> float:
+        """Keyword match score of the current resume."""
+        if not self.job_total:
+            return 0.0
+        return (self.match_count / self.job_total) * 100
+
+    def features(self) -> Dict:
+        """Format and content features of the current resume, as ``ATSScorer.scan_text`` returns."""
+        sections = list(self.sections.values())
+        skeleton = "".join(section.edges(section.text) for section in sections)
+        skeleton_lower = "".join(section.edges(section.lower) for section in sections)
+        present = set().union(*(section.sections for section in sections))
+        present.update(section for section in REQUIRED_SECTIONS if section in skeleton_lower)
+        return {
+            'missing_sections': [section for section in REQUIRED_SECTIONS if section not in present],
+            'has_bullets': any(section.has_bullets for section in sections),
+            'has_extra_spacing': any(section.has_extra_spacing for section in sections)
+            or SPACING_PATTERN.search(skeleton) is not None,
+            'has_action_verbs': any(section.has_action_verbs for section in sections)
+            or ACTION_VERB_PATTERN.search(skeleton_lower) is not None,
+            'has_quantified': any(section.has_quantified for section in sections)
+            or QUANTIFIED_PATTERN.search(skeleton) is not None,
+            'word_count': sum(section.word_count for section in sections),
+        }
+
+    def score(self) -> float:
+        """Overall ATS compatibility score of the current resume."""
+        features = self.features()
+        return self.scorer.combine_scores(
+            self.keyword_score(),
+            self.scorer._format_score(features),
+            self.scorer._content_score(features)
+        )
+
+    def missing_keywords(self) -> List[str]:
+        """Job keywords absent from the resume, in order of appearance."""
+        return [k for k in self.job_order if k not in self.resume_keywords]
+
+    def report(self) -> ScoreReport:
+        """Full ATS report of the current resume, as ``ATSScorer.analyze`` returns."""
+        features = self.features()
+        keyword_score = self.keyword_score()
+        format_score = self.scorer._format_score(features)
+        content_score = self.scorer._content_score(features)
+        missing_keywords = self.scorer.display_keywords(self.missing_keywords())
+        return ScoreReport(
+            keyword_score=keyword_score,
+            format_score=format_score,
+            content_score=content_score,
+            total_score=self.scorer.combine_scores(keyword_score, format_score, content_score),
+            missing_keywords=missing_keywords,
+            suggestions=self.scorer._suggestions(missing_keywords, features)
+        )
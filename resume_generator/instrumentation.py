@@ -0,0 +1,163 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import defaultdict
+import bisect
+import threading
+import time
+from config import settings
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class _NullStage:
+    """Shared no-op context manager used while instrumentation is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _Stage:
+    """Times one pipeline stage and reports it on exit."""
+    __slots__ = ('instrumentation', 'name', 'labels', 'start')
+
+    def __init__(self, instrumentation: "Instrumentation", name: str, labels: Dict[str, str]):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        labels = dict(self.labels, stage=self.name)
+        self.instrumentation.observe('stage_duration_seconds', duration, **labels)
+        if exc_type is not None:
+            self.instrumentation.count('stage_errors_total', **labels)
+        self.instrumentation.emit('stage', stage=self.name, duration=duration,
+                                  error=exc_type.__name__ if exc_type else None, **self.labels)
+        return False
+
+class Instrumentation:
+    """Per-stage timings, counters and structured events for the generation pipeline.
+    
+    Stages are timed with ``with instrumentation.stage("llm_call"):``, and
+    counters are bumped with ``count``. Every measurement is also emitted as a
+    structured event dict to the registered sinks, and ``render_prometheus``
+    exposes counters and histograms in the Prometheus text format. While
+    disabled, ``stage`` returns a shared no-op context manager and the other
+    methods return immediately.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.sinks: List[Callable[[Dict], None]] = []
+        self.counters: Dict[Tuple[str, Labels], float] = defaultdict(float)
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink: Callable[[Dict], None]):
+        """Register a callable that receives every structured event."""
+        self.sinks.append(sink)
+
+    def stage(self, name: str, **labels: str):
+        """Context manager timing one stage of the pipeline."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, labels)
+
+    def count(self, name: str, value: float = 1, **labels: str):
+        """Increase a counter."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] += value
+
+    def observe(self, name: str, value: float, **labels: str):
+        """Record a value in a histogram."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def emit(self, event: str, **fields):
+        """Send a structured event to every sink."""
+        if not self.enabled or not self.sinks:
+            return
+        record = dict(fields, event=event, timestamp=time.time())
+        for sink in self.sinks:
+            sink(record)
+
+    def record_tokens(self, response, **labels: str):
+        """Count prompt and completion tokens reported on an LLM response."""
+        if not self.enabled:
+            return
+        usage = getattr(response, 'usage_metadata', None) or {}
+        prompt_tokens = usage.get('input_tokens', 0)
+        completion_tokens = usage.get('output_tokens', 0)
+        self.count('llm_prompt_tokens_total', prompt_tokens, **labels)
+        self.count('llm_completion_tokens_total', completion_tokens, **labels)
+        self.emit('tokens', prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, **labels)
+
+    def reset(self):
+        """Drop every recorded counter and histogram."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def render_prometheus(self, prefix: str = "resume_builder_") -> str:
+        """Render counters and histograms in the Prometheus text exposition format."""
+        def format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = list(labels) + ([extra] if extra else [])
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+        
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append(f"{prefix}{name}{format_labels(labels)} {value:g}")
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for (metric, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float('inf') else f"{bound:g}"
+                        lines.append(f"{prefix}{name}_bucket{format_labels(labels, ('le', le))} {cumulative}")
+                    lines.append(f"{prefix}{name}_sum{format_labels(labels)} {histogram.sum:g}")
+                    lines.append(f"{prefix}{name}_count{format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+# Process-wide instrumentation, enabled with INSTRUMENTATION_ENABLED=true
+instrumentation = Instrumentation(enabled=settings.INSTRUMENTATION_ENABLED)
@@ -0,0 +1,333 @@
+from typing import List, Dict, Tuple, Optional, Iterable
+from array import array
+from collections import Counter, defaultdict
+import heapq
+import json
+import math
+import mmap
+import os
+from .ats_scorer import ATSScorer
+from .keyword_matrix import _numpy
+
+RANKINGS = ('keyword', 'bm25')
+
+class _Segment:
+    """An immutable, memory-mapped block of postings grouped by term."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.terms: Dict[int, Tuple[int, int]] = {}
+        term_table = array('I')
+        with open(path + '.terms', 'rb') as f:
+            term_table.frombytes(f.read())
+        for i in range(0, len(term_table), 3):
+            self.terms[term_table[i]] = (term_table[i + 1], term_table[i + 2])
+        
+        self._file = open(path + '.post', 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.postings = memoryview(self._map).cast('I') if self._map is not None else memoryview(array('I'))
+
+    def get(self, term_id: int):
+        """Return the (doc, count, doc, count, ...) slice for a term."""
+        entry = self.terms.get(term_id)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self.postings[offset:offset + 2 * length]
+
+    def close(self):
+        self.postings.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    @staticmethod
+    def write(path: str, postings: Dict[int, List[Tuple[int, int]]]):
+        """Write postings grouped by term; the term table is written last."""
+        data = array('I')
+        table = array('I')
+        for term_id in sorted(postings):
+            entries = postings[term_id]
+            table.extend((term_id, len(data), len(entries)))
+            for doc, count in entries:
+                data.append(doc)
+                data.append(count)
+        with open(path + '.post', 'wb') as f:
+            data.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(path + '.terms.tmp', 'wb') as f:
+            table.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.terms.tmp', path + '.terms')
+
+class JobIndex:
+    """Persistent inverted index of job descriptions.
+    
+    Postings lists live on disk in append-only, memory-mapped segments.
+    ``add`` buffers new postings until ``flush`` writes them as a new segment;
+    ``remove`` records a tombstone; ``compact`` merges segments and drops
+    removed postings. ``search`` ranks postings by the ``ATSScorer`` keyword
+    match score or by BM25, touching only the postings of the resume's keywords.
+    """
+
+    def __init__(self, path: str, scorer: Optional[ATSScorer] = None, flush_every: int = 10000):
+        self.path = path
+        self.scorer = scorer or ATSScorer()
+        self.flush_every = flush_every
+        os.makedirs(path, exist_ok=True)
+        
+        self.term_ids: Dict[str, int] = {}
+        self.doc_keys: List[str] = []
+        self.doc_totals: List[int] = []
+        self.key_to_doc: Dict[str, int] = {}
+        self.deleted = set()
+        self.segments: List[_Segment] = []
+        self._pending: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        self._pending_terms: List[str] = []
+        self._pending_docs: List[int] = []
+        self._pending_deleted: List[int] = []
+        self._load()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        """Load the vocabulary, document table, tombstones and segments."""
+        if os.path.exists(self._file('terms.txt')):
+            with open(self._file('terms.txt'), encoding='utf-8') as f:
+                for line in f:
+                    self.term_ids[line.rstrip('\n')] = len(self.term_ids)
+        if os.path.exists(self._file('docs.jsonl')):
+            with open(self._file('docs.jsonl'), encoding='utf-8') as f:
+                for line in f:
+                    doc = json.loads(line)
+                    self.key_to_doc[doc['key']] = len(self.doc_keys)
+                    self.doc_keys.append(doc['key'])
+                    self.doc_totals.append(doc['total'])
+        if os.path.exists(self._file('deleted.txt')):
+            with open(self._file('deleted.txt'), encoding='utf-8') as f:
+                self.deleted.update(int(line) for line in f if line.strip())
+        for doc in self.deleted:
+            if doc < len(self.doc_keys) and self.key_to_doc.get(self.doc_keys[doc]) == doc:
+                del self.key_to_doc[self.doc_keys[doc]]
+        for name in sorted(os.listdir(self.path)):
+            if name.endswith('.terms') and name.startswith('segment-'):
+                self.segments.append(_Segment(self._file(name[:-len('.terms')])))
+
+    def __len__(self) -> int:
+        return len(self.key_to_doc)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.key_to_doc
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _intern(self, term: str) -> int:
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = len(self.term_ids)
+            self.term_ids[term] = term_id
+            self._pending_terms.append(term)
+        return term_id
+
+    def add(self, key: str, job_description: str):
+        """Index a job description, replacing any posting with the same key."""
+        if key in self.key_to_doc:
+            self.remove(key)
+        
+        keywords = self.scorer.extract_keywords(job_description)
+        doc = len(self.doc_keys)
+        self.doc_keys.append(key)
+        self.doc_totals.append(len(keywords))
+        self.key_to_doc[key] = doc
+        self._pending_docs.append(doc)
+        for term, count in Counter(keywords).items():
+            self._pending[self._intern(term)].append((doc, count))
+        
+        if len(self._pending_docs) >= self.flush_every:
+            self.flush()
+
+    def add_many(self, postings: Iterable[Tuple[str, str]]):
+        """Index many (key, job description) pairs and flush once."""
+        for key, job_description in postings:
+            self.add(key, job_description)
+        self.flush()
+
+    def remove(self, key: str) -> bool:
+        """Remove a posting by key. Returns False if the key is unknown."""
+        doc = self.key_to_doc.pop(key, None)
+        if doc is None:
+            return False
+        self.deleted.add(doc)
+        self._pending_deleted.append(doc)
+        return True
+
+    def flush(self):
+        """Persist buffered postings and removals as a new segment."""
+        if not self._pending_docs and not self._pending_deleted:
+            return
+        with open(self._file('terms.txt'), 'a', encoding='utf-8') as f:
+            f.writelines(term + '\n' for term in self._pending_terms)
+        with open(self._file('docs.jsonl'), 'a', encoding='utf-8') as f:
+            for doc in self._pending_docs:
+                f.write(json.dumps({
+                    'key': self.doc_keys[doc],
+                    'total': self.doc_totals[doc]
+                }) + '\n')
+        if self._pending:
+            self._write_segment(self._pending)
+        with open(self._file('deleted.txt'), 'a', encoding='utf-8') as f:
+            f.writelines(f"{doc}\n" for doc in self._pending_deleted)
+        self._pending = defaultdict(list)
+        self._pending_terms = []
+        self._pending_docs = []
+        self._pending_deleted = []
+
+    def _write_segment(self, postings: Dict[int, List[Tuple[int, int]]]):
+        number = max((int(os.path.basename(s.path)[len('segment-'):]) for s in self.segments), default=0) + 1
+        path = self._file(f"segment-{number:06d}")
+        _Segment.write(path, postings)
+        self.segments.append(_Segment(path))
+
+    def _live_postings(self) -> Dict[int, List[Tuple[int, int]]]:
+        """Collect the postings of all segments, skipping removed jobs."""
+        merged: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for segment in self.segments:
+            for term_id in segment.terms:
+                entries = segment.get(term_id)
+                for i in range(0, len(entries), 2):
+                    if entries[i] not in self.deleted:
+                        merged[term_id].append((entries[i], entries[i + 1]))
+                entries.release()
+        return merged
+
+    def compact(self):
+        """Merge all segments into one, dropping postings of removed jobs."""
+        self.flush()
+        merged = self._live_postings()
+        old_segments = list(self.segments)
+        if merged:
+            self._write_segment(merged)
+        self.segments = self.segments[len(old_segments):]
+        for segment in old_segments:
+            segment.close()
+            os.remove(segment.path + '.terms')
+            os.remove(segment.path + '.post')
+
+    def close(self):
+        """Flush buffered postings and release the memory maps."""
+        self.flush()
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+    def _postings(self, term_id: int):
+        """Yield the postings slices for a term across segments and the buffer."""
+        for segment in self.segments:
+            entries = segment.get(term_id)
+            if entries is not None:
+                yield entries
+        if term_id in self._pending:
+            yield array('I', [value for entry in self._pending[term_id] for value in entry])
+
+    def search(self, resume_text: str, k: int = 10, ranking: str = 'keyword',
+               k1: float = 1.2, b: float = 0.75) -> List[Tuple[str, float]]:
+        """Return the top-k (key, score) postings for a resume.
+        
+        ``ranking='keyword'`` reproduces ``ATSScorer.calculate_keyword_match``
+        for each posting; ``ranking='bm25'`` uses Okapi BM25 over the same
+        keywords.
+        """
+        if ranking not in RANKINGS:
+            raise ValueError(f"Unknown ranking '{ranking}', expected one of {RANKINGS}")
+        query = Counter(self.scorer.extract_keywords(resume_text))
+        terms = [(self.term_ids[t], count) for t, count in query.items() if t in self.term_ids]
+        if not terms or not self.key_to_doc:
+            return []
+        
+        np = _numpy()
+        if np is not None:
+            scores = self._score_numpy(np, terms, ranking, k1, b)
+            alive = scores > 0
+            if self.deleted:
+                alive[list(self.deleted)] = False
+            candidates = np.flatnonzero(alive)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            top = sorted(((float(scores[d]), int(d)) for d in candidates), key=lambda x: (-x[0], x[1]))
+        else:
+            scores = self._score_python(terms, ranking, k1, b)
+            top = heapq.nsmallest(k, ((-s, d) for d, s in scores.items() if s > 0 and d not in self.deleted))
+            top = [(-s, d) for s, d in top]
+        return [(self.doc_keys[doc], score) for score, doc in top]
+
+    def _bm25_params(self):
+        """Document count and average length over live documents; removed ones still on disk are ignored."""
+        lengths = [self.doc_totals[d] for d in self.key_to_doc.values()]
+        return len(lengths), (sum(lengths) / len(lengths)) or 1.0
+
+    def _score_numpy(self, np, terms, ranking, k1, b):
+        n_docs = len(self.doc_keys)
+        docs, weights = [], []
+        if ranking == 'keyword':
+            for term_id, query_count in terms:
+                for entries in self._postings(term_id):
+                    pairs = np.frombuffer(entries, dtype=np.uint32).reshape(-1, 2)
+                    docs.append(pairs[:, 0])
+                    weights.append(np.minimum(pairs[:, 1], query_count))
+            matches = self._accumulate(np, docs, weights, n_docs)
+            totals = np.asarray(self.doc_totals, dtype=np.float64)
+            scores = np.zeros(n_docs, dtype=np.float64)
+            nonempty = totals > 0
+            scores[nonempty] = (matches[nonempty] / totals[nonempty]) * 100
+            return scores
+        
+        total_docs, avgdl = self._bm25_params()
+        norms = k1 * (1 - b + b * np.asarray(self.doc_totals, dtype=np.float64) / avgdl)
+        live = np.ones(n_docs, dtype=bool)
+        if self.deleted:
+            live[list(self.deleted)] = False
+        for term_id, _ in terms:
+            blocks = [np.frombuffer(entries, dtype=np.uint32).reshape(-1, 2) for entries in self._postings(term_id)]
+            df = sum(int(np.count_nonzero(live[block[:, 0]])) for block in blocks)
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+            for block in blocks:
+                tf = block[:, 1].astype(np.float64)
+                docs.append(block[:, 0])
+                weights.append(idf * tf * (k1 + 1) / (tf + norms[block[:, 0]]))
+        return self._accumulate(np, docs, weights, n_docs)
+
+    @staticmethod
+    def _accumulate(np, docs, weights, n_docs):
+        """Sum per-posting weights into one score per document."""
+        if not docs:
+            return np.zeros(n_docs, dtype=np.float64)
+        return np.bincount(np.concatenate(docs), np.concatenate(weights), minlength=n_docs)
+
+    def _score_python(self, terms, ranking, k1, b):
+        scores: Dict[int, float] = defaultdict(float)
+        if ranking == 'keyword':
+            for term_id, query_count in terms:
+                for entries in self._postings(term_id):
+                    for i in range(0, len(entries), 2):
+                        scores[entries[i]] += min(entries[i + 1], query_count)
+            return {d: (m / self.doc_totals[d]) * 100 for d, m in scores.items() if self.doc_totals[d]}
+        
+        total_docs, avgdl = self._bm25_params()
+        for term_id, _ in terms:
+            blocks = list(self._postings(term_id))
+            df = sum(1 for entries in blocks for i in range(0, len(entries), 2) if entries[i] not in self.deleted)
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+            for entries in blocks:
+                for i in range(0, len(entries), 2):
+                    doc, tf = entries[i], entries[i + 1]
+                    norm = k1 * (1 - b + b * self.doc_totals[doc] / avgdl)
+                    scores[doc] += idf * tf * (k1 + 1) / (tf + norm)
+        return scores
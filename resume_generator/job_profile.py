@@ -0,0 +1,233 @@
+from typing import Dict, List, Optional
+from collections import Counter
+from functools import lru_cache
+import asyncio
+import re
+import threading
+from pydantic import BaseModel, Field
+from config import settings
+from .models import JobAnalysis
+from .ats_scorer import ATSScorer
+from .llm_cache import MemoryCache, SQLiteCache
+from .memo import content_hash
+
+# Keyword weights by where the structured analysis lists a keyword
+REQUIRED_SKILL_WEIGHT = 3.0
+PREFERRED_WEIGHT = 2.0
+
+class JobProfile(BaseModel):
+    """A job posting analyzed once: structured requirements plus weighted keyword counts.
+    
+    ``keywords`` holds the posting's keyword counts in order of first
+    appearance, plus any analysis keyword the posting does not spell out.
+    ``weights`` raises keywords of required skills and of preferred
+    qualifications or industry keywords; without an analysis every weight
+    is 1 and scores equal ``ATSScorer.analyze`` on the raw posting.
+    """
+    content_hash: str = Field(description="Content hash of the job description")
+    job_description: str = Field(description="The job description text")
+    analysis: Optional[JobAnalysis] = Field(None, description="Structured LLM analysis, if requested")
+    keywords: Dict[str, int] = Field(description="Keyword counts in order of first appearance")
+    weights: Dict[str, float] = Field(description="Per-keyword weights")
+
+    @property
+    def total(self) -> float:
+        return sum(count * self.weights[k] for k, count in self.keywords.items())
+
+    def keyword_score(self, resume_counter: Dict[str, int]) -> float:
+        """Weighted share of the job's keyword occurrences matched by the resume (0-100)."""
+        total = self.total
+        if not total:
+            return 0.0
+        matched = sum(
+            min(count, resume_counter[k]) * self.weights[k]
+            for k, count in self.keywords.items() if k in resume_counter
+        )
+        return (matched / total) * 100
+
+    def missing_keywords(self, resume_counter: Dict[str, int]) -> List[str]:
+        """Job keywords absent from the resume, highest weight first, then in order of appearance."""
+        missing = [k for k in self.keywords if k not in resume_counter]
+        return sorted(missing, key=lambda k: -self.weights[k])
+
+    def missing_required_skills(self, resume_lower: str) -> List[str]:
+        """Required skills from the analysis that the lowercase resume text never mentions."""
+        if self.analysis is None:
+            return []
+        return [skill for skill in self.analysis.required_skills
+                if not _skill_pattern(skill.lower()).search(resume_lower)]
+
+    def requirements_text(self) -> str:
+        """Short summary of the analysis for prompts, or an empty string."""
+        if self.analysis is None:
+            return ""
+        lines = []
+        if self.analysis.required_skills:
+            lines.append(f"Required skills: {', '.join(self.analysis.required_skills)}")
+        if self.analysis.preferred_qualifications:
+            lines.append(f"Preferred qualifications: {', '.join(self.analysis.preferred_qualifications)}")
+        if self.analysis.industry_keywords:
+            lines.append(f"Industry keywords: {', '.join(self.analysis.industry_keywords)}")
+        return "\n".join(lines)
+
+@lru_cache(maxsize=4096)
+def _skill_pattern(skill: str) -> "re.Pattern":
+    """Match a skill as a whole term, so "go" does not match "good" nor "java" "javascript"."""
+    return re.compile(r'(?<!\w)' + re.escape(skill) + r'(?!\w)')
+
+def job_hash(job_description: str) -> str:
+    """Content hash identifying a job posting."""
+    return content_hash(job_description.strip())
+
+def build_job_profile(job_description: str, analysis: Optional[JobAnalysis] = None,
+                      scorer: Optional[ATSScorer] = None) -> JobProfile:
+    """Build a profile from a posting and, optionally, its structured analysis."""
+    scorer = scorer or ATSScorer()
+    keywords = Counter(scorer.extract_keywords(job_description))
+    weights = dict.fromkeys(keywords, 1.0)
+    if analysis is not None:
+        weighted = [(analysis.required_skills, REQUIRED_SKILL_WEIGHT),
+                    (analysis.preferred_qualifications + analysis.industry_keywords, PREFERRED_WEIGHT)]
+        for phrases, weight in weighted:
+            for keyword in scorer.extract_keywords(" ".join(phrases)):
+                if keyword not in keywords:
+                    keywords[keyword] = 1
+                weights[keyword] = max(weights.get(keyword, 1.0), weight)
+    return JobProfile(
+        content_hash=job_hash(job_description),
+        job_description=job_description,
+        analysis=analysis,
+        keywords=dict(keywords),
+        weights=weights
+    )
+
+class JobProfileStore:
+    """Job profiles keyed by content hash, with an in-memory and an optional SQLite tier.
+    
+    ``get_or_build`` analyzes each posting at most once per store: concurrent
+    requests for the same posting wait for the first one instead of calling
+    the LLM again. Analyzed (weighted) and unanalyzed profiles are stored
+    under separate keys, so a request for an unanalyzed profile gets the
+    same result whether or not the posting was analyzed before, unless it
+    asks for ``prefer_analyzed`` to reuse an existing analysis. Profiles
+    depend on the scorer's keyword extraction, so one store should serve one
+    scorer configuration.
+    """
+
+    def __init__(self, path: str = "", max_entries: int = 1024, scorer: Optional[ATSScorer] = None):
+        self.memory = MemoryCache(max_entries)
+        self.disk = SQLiteCache(path) if path else None
+        self.scorer = scorer or ATSScorer()
+        self.analyses = 0
+        self.hits = 0
+        self.misses = 0
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._tasks: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _key(content_hash: str, analyzed: bool) -> str:
+        return f"{content_hash}:{'analyzed' if analyzed else 'plain'}"
+
+    def get(self, job_description: str, analyzed: bool = True) -> Optional[JobProfile]:
+        """Return the stored analyzed (or, with ``analyzed=False``, unweighted) profile of a posting, or None."""
+        key = self._key(job_hash(job_description), analyzed)
+        profile = self.memory.get(key)
+        if profile is None and self.disk is not None:
+            stored = self.disk.get(key)
+            if stored is not None:
+                profile = JobProfile.model_validate_json(stored)
+                self.memory.set(key, profile)
+        return profile
+
+    def put(self, profile: JobProfile):
+        """Store a profile in every tier."""
+        key = self._key(profile.content_hash, profile.analysis is not None)
+        self.memory.set(key, profile)
+        if self.disk is not None:
+            self.disk.set(key, profile.model_dump_json())
+
+    def _cached(self, job_description: str, analyze: bool, prefer_analyzed: bool = False) -> Optional[JobProfile]:
+        profile = self.get(job_description, True) if prefer_analyzed and not analyze else None
+        if profile is None:
+            profile = self.get(job_description, analyze)
+        if profile is not None:
+            self.hits += 1
+        return profile
+
+    def get_or_build(self, job_description: str, analyze: bool = True, prefer_analyzed: bool = False) -> JobProfile:
+        """Return the posting's profile, building it (and analyzing it when ``analyze``) on first use.
+        
+        With ``analyze=False`` and ``prefer_analyzed``, an analyzed profile
+        that is already stored is returned instead of the unweighted one.
+        """
+        profile = self._cached(job_description, analyze, prefer_analyzed)
+        if profile is not None:
+            return profile
+        key = self._key(job_hash(job_description), analyze)
+        with self._locks_lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                profile = self._cached(job_description, analyze, prefer_analyzed)
+                if profile is not None:
+                    return profile
+                self.misses += 1
+                analysis = None
+                if analyze:
+                    from .llm_utils import analyze_job_description
+                    analysis = analyze_job_description(job_description)
+                    self.analyses += 1
+                profile = build_job_profile(job_description, analysis, self.scorer)
+                self.put(profile)
+                return profile
+        finally:
+            with self._locks_lock:
+                self._locks.pop(key, None)
+
+    async def aget_or_build(self, job_description: str, analyze: bool = True,
+                            prefer_analyzed: bool = False) -> JobProfile:
+        """Async counterpart of ``get_or_build``; concurrent callers share one analysis."""
+        profile = self._cached(job_description, analyze, prefer_analyzed)
+        if profile is not None:
+            return profile
+        key = self._key(job_hash(job_description), analyze)
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._abuild(job_description, analyze))
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _abuild(self, job_description: str, analyze: bool) -> JobProfile:
+        self.misses += 1
+        analysis = None
+        if analyze:
+            from .llm_utils import aanalyze_job_description
+            analysis = await aanalyze_job_description(job_description)
+            self.analyses += 1
+        # Keyword extraction is CPU-bound; keep it off the event loop
+        profile = await asyncio.to_thread(build_job_profile, job_description, analysis, self.scorer)
+        self.put(profile)
+        return profile
+
+    def stats(self) -> Dict[str, int]:
+        return {'analyses': self.analyses, 'hits': self.hits, 'misses': self.misses, 'entries': len(self.memory)}
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_job_profile_store() -> JobProfileStore:
+    """Return the shared job profile store, built from settings on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = JobProfileStore(settings.JOB_PROFILE_PATH, settings.JOB_PROFILE_CACHE_SIZE)
+    return _store
+
+def set_job_profile_store(store: Optional[JobProfileStore]):
+    """Replace the shared job profile store. Pass None to rebuild it on next use."""
+    global _store
+    with _store_lock:
+        _store = store
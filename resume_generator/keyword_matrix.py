@@ -0,0 +1,161 @@
+from typing import List, Dict, Iterable, Iterator, Optional
+from collections import Counter
+
+# Upper bound on the number of cells materialized at once while matching
+DEFAULT_MAX_CELLS = 1 << 22
+DEFAULT_CHUNK_SIZE = 256
+
+_numpy_module = None
+
+def _numpy():
+    """Import NumPy on first use, returning None when it is not installed."""
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+            _numpy_module = numpy
+        except ImportError:
+            _numpy_module = False
+    return _numpy_module or None
+
+def match_counters(resume_counter: Dict[str, int], job_counter: Dict[str, int]) -> float:
+    """Calculate the keyword match score between two keyword profiles."""
+    total_keywords = sum(job_counter.values())
+    if not total_keywords:
+        return 0.0
+    
+    # Walk the smaller profile; only shared keywords contribute
+    if len(resume_counter) < len(job_counter):
+        smaller, other = resume_counter, job_counter
+    else:
+        smaller, other = job_counter, resume_counter
+    match_score = sum(min(count, other[k]) for k, count in smaller.items() if k in other)
+    
+    return (match_score / total_keywords) * 100
+
+class Vocabulary:
+    """Interns keyword strings to dense integer IDs."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.tokens: List[str] = []
+
+    def intern(self, token: str) -> int:
+        """Return the ID of a token, assigning a new one if needed."""
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = len(self.tokens)
+            self.ids[token] = token_id
+            self.tokens.append(token)
+        return token_id
+
+    def get(self, token: str) -> Optional[int]:
+        """Return the ID of a known token or None."""
+        return self.ids.get(token)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+class KeywordMatrix:
+    """Job keyword profiles packed into a sparse count matrix.
+    
+    Jobs are stored in CSR layout over a vocabulary of interned token IDs.
+    Resumes are matched in chunks: each chunk becomes a dense count block
+    restricted to the job vocabulary, and the min-count overlaps against all
+    jobs are computed with array operations. Scores are identical to
+    ``ATSScorer.calculate_keyword_match``. Without NumPy the matrix falls back
+    to matching ``Counter`` profiles pair by pair.
+    """
+
+    def __init__(self, job_profiles: Iterable[Dict[str, int]], use_numpy: Optional[bool] = None,
+                 max_cells: int = DEFAULT_MAX_CELLS):
+        self.profiles = [Counter(profile) for profile in job_profiles]
+        self.max_cells = max_cells
+        self.vocabulary = Vocabulary()
+        self.np = _numpy() if use_numpy is not False else None
+        if use_numpy and self.np is None:
+            raise ImportError("NumPy is required for the vectorized keyword matrix")
+        if self.np is not None:
+            self._build_csr()
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def _build_csr(self):
+        """Pack the job profiles into CSR arrays."""
+        np = self.np
+        indptr = [0]
+        indices = []
+        counts = []
+        for profile in self.profiles:
+            for token, count in profile.items():
+                indices.append(self.vocabulary.intern(token))
+                counts.append(count)
+            indptr.append(len(indices))
+        
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.totals = np.asarray([sum(profile.values()) for profile in self.profiles], dtype=np.int64)
+
+    def resume_chunk_size(self) -> int:
+        """Number of resumes matched per dense block."""
+        return max(1, min(DEFAULT_CHUNK_SIZE, self.max_cells // max(1, len(self.vocabulary))))
+
+    def match_block(self, resume_profiles: List[Dict[str, int]]):
+        """Match a block of resume profiles against every job.
+        
+        Returns an array (or list of lists without NumPy) with one row per
+        resume and one keyword match score per job.
+        """
+        if self.np is None:
+            return [[match_counters(resume, job) for job in self.profiles] for resume in resume_profiles]
+        
+        np = self.np
+        rows, cols, values = [], [], []
+        for row, profile in enumerate(resume_profiles):
+            for token, count in profile.items():
+                token_id = self.vocabulary.get(token)
+                if token_id is not None:
+                    rows.append(row)
+                    cols.append(token_id)
+                    values.append(count)
+        dense = np.zeros((len(resume_profiles), len(self.vocabulary)), dtype=np.int64)
+        dense[rows, cols] = values
+        
+        # Jobs are processed in column blocks so no gather exceeds the cell budget
+        budget = max(1, self.max_cells // max(1, len(resume_profiles)))
+        matches = np.empty((len(resume_profiles), len(self.profiles)), dtype=np.int64)
+        start = 0
+        while start < len(self.profiles):
+            end = int(np.searchsorted(self.indptr, self.indptr[start] + budget, side='right')) - 1
+            end = min(max(end, start + 1), len(self.profiles))
+            lo, hi = self.indptr[start], self.indptr[end]
+            overlap = np.minimum(dense[:, self.indices[lo:hi]], self.counts[lo:hi])
+            cumulative = np.zeros((len(resume_profiles), hi - lo + 1), dtype=np.int64)
+            np.cumsum(overlap, axis=1, out=cumulative[:, 1:])
+            bounds = self.indptr[start:end + 1] - lo
+            matches[:, start:end] = cumulative[:, bounds[1:]] - cumulative[:, bounds[:-1]]
+            start = end
+        
+        # Same float operations as the scalar path: (match / total) * 100
+        scores = np.zeros(matches.shape, dtype=np.float64)
+        nonempty = self.totals > 0
+        scores[:, nonempty] = (matches[:, nonempty] / self.totals[nonempty]) * 100
+        return scores
+
+    def iter_match(self, resume_profiles: Iterable[Dict[str, int]],
+                   chunk_size: Optional[int] = None) -> Iterator[List[List[float]]]:
+        """Yield keyword match rows for resumes, one bounded chunk at a time."""
+        chunk_size = chunk_size or self.resume_chunk_size()
+        chunk = []
+        for profile in resume_profiles:
+            chunk.append(profile)
+            if len(chunk) == chunk_size:
+                yield self._as_rows(self.match_block(chunk))
+                chunk = []
+        if chunk:
+            yield self._as_rows(self.match_block(chunk))
+
+    def _as_rows(self, block) -> List[List[float]]:
+        return block if self.np is None else block.tolist()
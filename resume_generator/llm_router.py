@@ -0,0 +1,238 @@
+from typing import Dict, Iterator, List, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import asyncio
+import threading
+import time
+from .instrumentation import instrumentation
+
+class BackendStats:
+    """Rolling latency and error-rate window of one backend."""
+
+    def __init__(self, window: int = 100):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        # Lower bounds of hedged calls that lost and were cancelled
+        self.censored = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: Optional[float], error: bool):
+        with self._lock:
+            if latency is not None and not error:
+                self.latencies.append(latency)
+            self.outcomes.append(error)
+
+    def record_censored(self, latency: float):
+        """Record that a call was still running after ``latency`` seconds; kept out of the percentiles."""
+        with self._lock:
+            self.censored.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile of successful calls, or None without samples."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def samples(self) -> int:
+        return len(self.latencies)
+
+class Backend:
+    """A named chat model registered with the router."""
+
+    def __init__(self, name: str, llm, window: int = 100):
+        self.name = name
+        self.llm = llm
+        self.stats = BackendStats(window)
+
+class LLMRouter:
+    """Routes chat calls across several backends by observed latency and health.
+    
+    Backends whose recent error rate exceeds ``max_error_rate`` are skipped
+    while a healthy one remains; among the rest, backends without enough
+    samples are tried first, then the lowest median latency wins. Failed calls
+    fall over to the next backend. With ``hedge=True`` a duplicate request is
+    sent to the runner-up once the primary exceeds its p95 latency; the first
+    successful response wins and the other request is cancelled (async) or
+    abandoned (sync, since running threads cannot be interrupted).
+    
+    The router exposes ``invoke``, ``ainvoke`` and ``stream`` so it can be
+    installed with ``set_llm``. Responses and stream chunks carry the name of
+    the backend that produced them in ``response_metadata['backend']``.
+    """
+
+    def __init__(self, hedge: bool = False, window: int = 100, max_error_rate: float = 0.5,
+                 min_samples: int = 5, max_workers: int = 16):
+        self.hedge = hedge
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.backends: Dict[str, Backend] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+
+    def register(self, name: str, llm) -> Backend:
+        """Add a chat backend under a unique name."""
+        backend = Backend(name, llm, self.window)
+        self.backends[name] = backend
+        return backend
+
+    def ranked(self) -> List[Backend]:
+        """Backends in routing order: healthy before unhealthy, unmeasured first, then fastest."""
+        def key(backend: Backend):
+            unhealthy = backend.stats.error_rate > self.max_error_rate
+            measured = backend.stats.samples >= self.min_samples
+            return (unhealthy, measured, backend.stats.percentile(0.5) or 0.0)
+        if not self.backends:
+            raise RuntimeError("No LLM backends registered")
+        return sorted(self.backends.values(), key=key)
+
+    def _hedge_delay(self, backend: Backend) -> Optional[float]:
+        """How long to wait for the primary before hedging, or None to not hedge."""
+        if not self.hedge or len(self.backends) < 2 or backend.stats.samples < self.min_samples:
+            return None
+        return backend.stats.percentile(0.95)
+
+    def _call(self, backend: Backend, prompt, kwargs):
+        start = time.perf_counter()
+        try:
+            response = backend.llm.invoke(prompt, **kwargs)
+        except Exception:
+            backend.stats.record(None, error=True)
+            instrumentation.count('llm_backend_errors_total', backend=backend.name)
+            raise
+        backend.stats.record(time.perf_counter() - start, error=False)
+        response.response_metadata['backend'] = backend.name
+        return response
+
+    async def _acall(self, backend: Backend, prompt, kwargs):
+        start = time.perf_counter()
+        try:
+            response = await backend.llm.ainvoke(prompt, **kwargs)
+        except asyncio.CancelledError:
+            # Not a latency sample: the caller gave up, not the backend
+            raise
+        except Exception:
+            backend.stats.record(None, error=True)
+            instrumentation.count('llm_backend_errors_total', backend=backend.name)
+            raise
+        backend.stats.record(time.perf_counter() - start, error=False)
+        response.response_metadata['backend'] = backend.name
+        return response
+
+    def invoke(self, prompt, **kwargs):
+        """Invoke the best backend, hedging and failing over as configured."""
+        backends = self.ranked()
+        tried = set()
+        last_error = None
+        for i, backend in enumerate(backends):
+            if backend.name in tried:
+                continue
+            delay = self._hedge_delay(backend) if i == 0 else None
+            try:
+                if delay is None:
+                    tried.add(backend.name)
+                    return self._call(backend, prompt, kwargs)
+                return self._hedged(backend, backends[1], delay, prompt, kwargs, tried)
+            except Exception as exc:
+                last_error = exc
+        raise last_error
+
+    def _hedged(self, primary: Backend, secondary: Backend, delay: float, prompt, kwargs, tried: set):
+        tried.add(primary.name)
+        futures = {self._pool.submit(self._call, primary, prompt, kwargs): primary}
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            instrumentation.count('llm_hedged_requests_total', backend=secondary.name)
+            tried.add(secondary.name)
+            futures[self._pool.submit(self._call, secondary, prompt, kwargs)] = secondary
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def ainvoke(self, prompt, **kwargs):
+        """Async counterpart of ``invoke``; losing hedged requests are cancelled."""
+        backends = self.ranked()
+        tried = set()
+        last_error = None
+        for i, backend in enumerate(backends):
+            if backend.name in tried:
+                continue
+            delay = self._hedge_delay(backend) if i == 0 else None
+            try:
+                if delay is None:
+                    tried.add(backend.name)
+                    return await self._acall(backend, prompt, kwargs)
+                return await self._ahedged(backend, backends[1], delay, prompt, kwargs, tried)
+            except Exception as exc:
+                last_error = exc
+        raise last_error
+
+    async def _ahedged(self, primary: Backend, secondary: Backend, delay: float, prompt, kwargs, tried: set):
+        tried.add(primary.name)
+        start = time.perf_counter()
+        primary_task = asyncio.ensure_future(self._acall(primary, prompt, kwargs))
+        backends = {primary_task: primary}
+        done, pending = await asyncio.wait({primary_task}, timeout=delay)
+        if not done:
+            instrumentation.count('llm_hedged_requests_total', backend=secondary.name)
+            tried.add(secondary.name)
+            secondary_task = asyncio.ensure_future(self._acall(secondary, prompt, kwargs))
+            backends[secondary_task] = secondary
+            pending.add(secondary_task)
+        error = None
+        try:
+            while done or pending:
+                for task in done:
+                    if task.exception() is None:
+                        # The losers were at least this slow
+                        for loser in pending:
+                            backends[loser].stats.record_censored(time.perf_counter() - start)
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+    def stream(self, prompt, **kwargs) -> Iterator:
+        """Stream from the best backend; latency is recorded for the whole stream."""
+        backend = self.ranked()[0]
+        start = time.perf_counter()
+        try:
+            for chunk in backend.llm.stream(prompt, **kwargs):
+                chunk.response_metadata['backend'] = backend.name
+                yield chunk
+        except Exception:
+            backend.stats.record(None, error=True)
+            raise
+        backend.stats.record(time.perf_counter() - start, error=False)
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Per-backend p50/p95 latency, error rate and count of cancelled hedge losers."""
+        return {
+            name: {
+                'p50': backend.stats.percentile(0.5),
+                'p95': backend.stats.percentile(0.95),
+                'error_rate': backend.stats.error_rate,
+                'censored': len(backend.stats.censored)
+            }
+            for name, backend in self.backends.items()
+        }
@@ -1,35 +1,322 @@
 from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
-from typing import List, Optional
-from config import settings
-import json
-
-class ResumeSection(BaseModel):
-    """Model for a resume section."""
-    title: str = Field(description="The title of the section")
-    content: str = Field(description="The content of the section in markdown format")
-
-class ResumeContent(BaseModel):
-    """Model for the complete resume content."""
-    summary: str = Field(description="Professional summary in markdown format")
-    experience: List[ResumeSection] = Field(description="List of experience sections")
-    education: List[ResumeSection] = Field(description="List of education sections")
-    skills: List[str] = Field(description="List of skills")
-    ats_score: float = Field(description="ATS compatibility score (0-100)")
-
-def initialize_llm():
-    """Initialize the LLM with Groq."""
+from typing import List, Optional, Callable, Any, AsyncContextManager, Tuple, Union
+from config import settings, require_groq_api_key
+from .models import ResumeContent, JobAnalysis
+from .job_profile import JobProfile
+from .llm_cache import LLMCache, MemoryCache, SQLiteCache, make_cache_key
+from .ats_scorer import ATSScorer, ScoreReport
+from .markdown_formatter import MarkdownFormatter
+from .instrumentation import instrumentation
+from .output_repair import StructuredOutputParser, PartialOutputError, repair_stats
+from .rate_limiter import Reservation, get_rate_limiter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import contextlib
+import contextvars
+import copy
+import httpx
+import math
+import threading
+import time
+
+class CompactionReport(BaseModel):
+    """Estimated prompt size before and after relevance-based compaction."""
+    tokens_before: int = Field(description="Estimated tokens of the full candidate information")
+    tokens_after: int = Field(description="Estimated tokens after compaction")
+    token_budget: int = Field(description="Requested token budget")
+    actions: List[str] = Field(default_factory=list, description="Trimming steps that were applied")
+
+def initialize_llm(model_name: Optional[str] = None):
+    """Initialize the LLM with Groq, backed by pooled HTTP clients."""
+    require_groq_api_key()
+    limits = httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS
+    )
     return ChatGroq(
         groq_api_key=settings.GROQ_API_KEY,
-        model_name=settings.MODEL_NAME,
+        model_name=model_name or settings.MODEL_NAME,
         temperature=settings.TEMPERATURE,
-        max_tokens=settings.MAX_TOKENS
+        max_tokens=settings.MAX_TOKENS,
+        request_timeout=settings.LLM_REQUEST_TIMEOUT,
+        http_client=httpx.Client(limits=limits, timeout=settings.LLM_REQUEST_TIMEOUT),
+        http_async_client=httpx.AsyncClient(limits=limits, timeout=settings.LLM_REQUEST_TIMEOUT)
     )
 
-def format_user_info(user_info: dict) -> str:
-    """Format user information for the prompt."""
+_llm = None
+_llm_lock = threading.Lock()
+
+def get_llm():
+    """Return the shared LLM client, creating it on first use.
+    
+    ``LLM_BACKEND=stub`` selects a local stub model that needs no API key.
+    ``LLM_FALLBACK_MODELS`` (comma-separated) routes across the primary and
+    fallback Groq models by observed latency and health, optionally hedging
+    slow requests (``LLM_HEDGE_REQUESTS``).
+    The client keeps its HTTP connections alive between calls, so requests
+    after the first skip connection setup and TLS. The async client should be
+    used from a single event loop.
+    """
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                if settings.LLM_BACKEND == "stub":
+                    from .stub_llm import StubChatModel
+                    _llm = StubChatModel(latency=settings.STUB_LLM_LATENCY)
+                elif settings.LLM_FALLBACK_MODELS:
+                    from .llm_router import LLMRouter
+                    _llm = LLMRouter(hedge=settings.LLM_HEDGE_REQUESTS)
+                    for model_name in [settings.MODEL_NAME] + settings.LLM_FALLBACK_MODELS.split(","):
+                        _llm.register(model_name.strip(), initialize_llm(model_name.strip()))
+                else:
+                    _llm = initialize_llm()
+    return _llm
+
+def set_llm(llm):
+    """Replace the shared LLM client. Pass None to recreate it on next use."""
+    global _llm
+    with _llm_lock:
+        _llm = llm
+
+_llm_cache = None
+_llm_cache_configured = False
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the LLM response cache, building it from settings on first use."""
+    global _llm_cache, _llm_cache_configured
+    if not _llm_cache_configured:
+        if settings.LLM_CACHE_ENABLED:
+            disk = None
+            if settings.LLM_CACHE_PATH:
+                disk = SQLiteCache(
+                    settings.LLM_CACHE_PATH,
+                    ttl=settings.LLM_CACHE_TTL,
+                    max_entries=settings.LLM_CACHE_MAX_ENTRIES
+                )
+            _llm_cache = LLMCache(MemoryCache(settings.LLM_CACHE_SIZE), disk)
+        _llm_cache_configured = True
+    return _llm_cache
+
+def set_llm_cache(cache: Optional[LLMCache]):
+    """Replace the LLM response cache. Pass None to disable caching."""
+    global _llm_cache, _llm_cache_configured
+    _llm_cache = cache
+    _llm_cache_configured = True
+
+def _cache_model() -> str:
+    """The model cache entries are stored for: the stub or the primary model."""
+    return "stub" if settings.LLM_BACKEND == "stub" else settings.MODEL_NAME
+
+def _answered_by(response) -> str:
+    """The model that produced a response or stream chunk.
+    
+    The router names the backend that answered; any other client is the
+    configured model.
+    """
+    metadata = getattr(response, 'response_metadata', None) or {}
+    return metadata.get('backend') or _cache_model()
+
+def _cache_lookup(prompt: str, temperature: Optional[float] = None) -> Tuple[Optional[LLMCache], str, Optional[str]]:
+    """Look a prompt up in the response cache."""
+    cache = get_llm_cache()
+    if temperature is None:
+        temperature = settings.TEMPERATURE
+    key = make_cache_key(settings.LLM_BACKEND, _cache_model(), temperature, settings.MAX_TOKENS, prompt)
+    content = cache.get(key) if cache is not None else None
+    if cache is not None:
+        instrumentation.count('llm_cache_requests_total', result='miss' if content is None else 'hit')
+    return cache, key, content
+
+def _cache_store(cache: Optional[LLMCache], key: str, content: str, model: str):
+    """Cache a completion unless a fallback model, not the one the key names, produced it."""
+    if cache is not None and model == _cache_model():
+        cache.set(key, content)
+
+Parser = Union[Callable[[str], Any], StructuredOutputParser]
+
+def _parse_completion(content: str, parse: Optional[Parser]) -> Any:
+    """Parse a completion, counting parse failures."""
+    if parse is None:
+        return content
+    if isinstance(parse, StructuredOutputParser):
+        parse = parse.parse
+    with instrumentation.stage('parse'):
+        try:
+            return parse(content)
+        except Exception:
+            instrumentation.count('parse_failures_total')
+            raise
+
+def _call_kwargs(temperature: Optional[float], parse: Optional[Parser]) -> dict:
+    """Per-call model parameters overriding the client's defaults."""
+    kwargs = {} if temperature is None else {'temperature': temperature}
+    if settings.LLM_JSON_MODE and isinstance(parse, StructuredOutputParser):
+        kwargs['response_format'] = {'type': 'json_object'}
+    return kwargs
+
+def _reserve(prompt: str) -> Optional[Reservation]:
+    """Wait for rate budget for one call; estimated as the prompt plus a full completion."""
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return None
+    return limiter.acquire(estimate_tokens(prompt) + settings.MAX_TOKENS)
+
+async def _areserve(prompt: str) -> Optional[Reservation]:
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return None
+    return await limiter.aacquire(estimate_tokens(prompt) + settings.MAX_TOKENS)
+
+def _call(prompt: str, kwargs: dict, **labels: str):
+    """Call the LLM within the shared rate limits."""
+    reservation = _reserve(prompt)
+    with instrumentation.stage('llm_call', **labels):
+        response = get_llm().invoke(prompt, **kwargs)
+    if reservation is not None:
+        reservation.settle(response)
+    return response
+
+async def _acall(prompt: str, kwargs: dict, **labels: str):
+    reservation = await _areserve(prompt)
+    with instrumentation.stage('llm_call', **labels):
+        response = await get_llm().ainvoke(prompt, **kwargs)
+    if reservation is not None:
+        await reservation.asettle(response)
+    return response
+
+def _record_outcome(outcome: str, tokens_saved: int = 0, latency_saved: float = 0.0, fixup: bool = False):
+    repair_stats.record(outcome, tokens_saved, latency_saved, fixup)
+    instrumentation.count('structured_outputs_total', outcome=outcome)
+    if tokens_saved:
+        instrumentation.count('repair_tokens_saved_total', tokens_saved)
+
+def _parse_structured(prompt: str, content: str, parser: StructuredOutputParser, latency: float) -> Any:
+    """Parse a fresh structured completion, repairing it locally if needed.
+    
+    A local repair is credited with the tokens and time of the regeneration
+    it avoided. ``PartialOutputError`` is left for the caller to fix up.
+    """
+    with instrumentation.stage('parse'):
+        try:
+            result, outcome = parser.parse_with_outcome(content)
+        except PartialOutputError:
+            instrumentation.count('parse_failures_total')
+            raise
+        except Exception:
+            instrumentation.count('parse_failures_total')
+            _record_outcome('failed')
+            raise
+    if outcome == 'repaired':
+        _record_outcome(outcome, estimate_tokens(prompt) + estimate_tokens(content), latency)
+    else:
+        _record_outcome(outcome)
+    return result
+
+def _finish_fix_up(parser: StructuredOutputParser, error: PartialOutputError, prompt: str, content: str,
+                   latency: float, fix_prompt: str, fix_response, fix_latency: float) -> Tuple[Any, str]:
+    """Merge a fix-up response into the partial output; returns the result and the JSON to cache."""
+    instrumentation.record_tokens(fix_response)
+    try:
+        result, fixed = parser.apply_fix_up(error, fix_response.content)
+    except Exception:
+        _record_outcome('failed', fixup=True)
+        raise
+    tokens_saved = (estimate_tokens(prompt) + estimate_tokens(content)
+                    - estimate_tokens(fix_prompt) - estimate_tokens(fix_response.content))
+    _record_outcome('fixed', tokens_saved, latency - fix_latency, fixup=True)
+    return result, fixed
+
+def complete_structured(prompt: str, content: str, parser: StructuredOutputParser, latency: float,
+                        temperature: Optional[float] = None) -> Tuple[Any, str]:
+    """Parse a fresh structured completion, repairing it locally or with a fix-up request.
+    
+    Returns the parsed result and the JSON to cache. ``latency`` is how long
+    the completion took, used to estimate what a regeneration would cost.
+    """
+    try:
+        return _parse_structured(prompt, content, parser, latency), content
+    except PartialOutputError as error:
+        fix_prompt = parser.fix_up_prompt(error)
+        start = time.perf_counter()
+        fix_response = _call(fix_prompt, _call_kwargs(temperature, parser), kind='fixup')
+        return _finish_fix_up(parser, error, prompt, content, latency, fix_prompt,
+                              fix_response, time.perf_counter() - start)
+
+async def acomplete_structured(prompt: str, content: str, parser: StructuredOutputParser, latency: float,
+                               temperature: Optional[float] = None) -> Tuple[Any, str]:
+    """Async counterpart of ``complete_structured``."""
+    try:
+        return _parse_structured(prompt, content, parser, latency), content
+    except PartialOutputError as error:
+        fix_prompt = parser.fix_up_prompt(error)
+        start = time.perf_counter()
+        fix_response = await _acall(fix_prompt, _call_kwargs(temperature, parser), kind='fixup')
+        return _finish_fix_up(parser, error, prompt, content, latency, fix_prompt,
+                              fix_response, time.perf_counter() - start)
+
+def invoke_llm(prompt: str, parse: Optional[Parser] = None,
+               temperature: Optional[float] = None) -> Any:
+    """Invoke the LLM through the response cache.
+    
+    Completions are cached by a hash of the backend, model, temperature, max
+    tokens and the fully formatted prompt; completions a fallback model
+    produced are not cached. When ``parse`` is given, the parsed result is
+    returned and only completions that parse successfully are cached.
+    ``temperature`` overrides ``settings.TEMPERATURE`` for this call.
+    
+    With a ``StructuredOutputParser``, the call uses JSON mode
+    (``settings.LLM_JSON_MODE``), malformed output is repaired locally, and
+    output that fails validation on only some fields gets a small fix-up
+    request instead of a full regeneration.
+    """
+    cache, key, content = _cache_lookup(prompt, temperature)
+    if content is not None:
+        return _parse_completion(content, parse)
+    
+    start = time.perf_counter()
+    response = _call(prompt, _call_kwargs(temperature, parse))
+    latency = time.perf_counter() - start
+    instrumentation.record_tokens(response)
+    content = response.content
+    if isinstance(parse, StructuredOutputParser):
+        result, content = complete_structured(prompt, content, parse, latency, temperature)
+    else:
+        result = _parse_completion(content, parse)
+    _cache_store(cache, key, content, _answered_by(response))
+    return result
+
+async def ainvoke_llm(prompt: str, parse: Optional[Parser] = None,
+                      temperature: Optional[float] = None) -> Any:
+    """Async counterpart of ``invoke_llm``."""
+    cache, key, content = _cache_lookup(prompt, temperature)
+    if content is not None:
+        return _parse_completion(content, parse)
+    
+    start = time.perf_counter()
+    response = await _acall(prompt, _call_kwargs(temperature, parse))
+    latency = time.perf_counter() - start
+    instrumentation.record_tokens(response)
+    content = response.content
+    if isinstance(parse, StructuredOutputParser):
+        result, content = await acomplete_structured(prompt, content, parse, latency, temperature)
+    else:
+        result = _parse_completion(content, parse)
+    _cache_store(cache, key, content, _answered_by(response))
+    return result
+
+def format_user_info(user_info: dict, job_description: Optional[str] = None,
+                     token_budget: Optional[int] = None, job_profile: Optional[JobProfile] = None) -> str:
+    """Format user information for the prompt.
+    
+    When ``job_description`` and ``token_budget`` are given, low-relevance
+    material is trimmed to fit the budget (see ``compact_user_info``).
+    """
+    if job_description and token_budget:
+        return compact_user_info(user_info, job_description, token_budget, job_profile=job_profile)[0]
+    
     formatted = []
     
     # Personal Information
@@ -91,10 +378,100 @@ def format_user_info(user_info: dict) -> str:
     
     return "\n".join(formatted)
 
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in a text (about 4 characters per token)."""
+    return math.ceil(len(text) / 4)
+
+def _relevance(text: str, job_keywords: set, scorer: ATSScorer) -> int:
+    """Count the distinct job keywords that occur in a text."""
+    return len(job_keywords.intersection(scorer.extract_keywords(text or "")))
+
+def _relevant_lines(text: str, job_keywords: set, scorer: ATSScorer, keep: int) -> str:
+    """Keep the ``keep`` lines of a text that share the most job keywords, in order."""
+    lines = [line for line in (text or "").splitlines() if line.strip()]
+    ranked = sorted(range(len(lines)), key=lambda i: -_relevance(lines[i], job_keywords, scorer))
+    kept = sorted(i for i in ranked[:keep] if _relevance(lines[i], job_keywords, scorer))
+    return "\n".join(lines[i] for i in kept)
+
+def compact_user_info(user_info: dict, job_description: str, token_budget: int,
+                      scorer: Optional[ATSScorer] = None,
+                      job_profile: Optional[JobProfile] = None) -> Tuple[str, CompactionReport]:
+    """Format user information, trimming low-relevance material to fit a token budget.
+    
+    Experience entries and skill lines are ranked by how many keywords they
+    share with the job description. Trimming stops as soon as the estimate
+    fits: optional contact fields and education details go first, then
+    skill lines with no matching keywords, then the least relevant experience
+    entries are summarized to their best lines, and finally dropped (the
+    most relevant entry is always kept). A ``job_profile`` supplies the job
+    keywords instead of re-extracting them from the posting.
+    """
+    scorer = scorer or ATSScorer()
+    text = format_user_info(user_info)
+    report = CompactionReport(tokens_before=estimate_tokens(text), tokens_after=estimate_tokens(text), token_budget=token_budget)
+    if report.tokens_before <= token_budget:
+        return text, report
+    
+    if job_profile is not None:
+        job_keywords = set(job_profile.keywords)
+    else:
+        job_keywords = set(scorer.extract_keywords(job_description))
+    compacted = copy.deepcopy(user_info)
+    experience = compacted['experience']
+    # Least relevant experience first
+    order = sorted(
+        range(len(experience)),
+        key=lambda i: _relevance(" ".join(str(v) for v in experience[i].values()), job_keywords, scorer)
+    )
+    
+    def drop_details():
+        for field in ('website', 'portfolio'):
+            compacted['personal_info'][field] = ''
+        for edu in compacted['education']:
+            for field in ('coursework', 'achievements'):
+                if not _relevance(edu.get(field), job_keywords, scorer):
+                    edu[field] = ''
+        return "Dropped optional contact fields and unrelated education details"
+    
+    def drop_skills():
+        for field, value in compacted['skills'].items():
+            lines = [line for line in (value or "").splitlines() if _relevance(line, job_keywords, scorer)]
+            compacted['skills'][field] = "\n".join(lines)
+        return "Dropped skills that do not match the job description"
+    
+    def summarize(i):
+        def step():
+            exp = experience[i]
+            for field in ('responsibilities', 'achievements'):
+                exp[field] = _relevant_lines(exp.get(field), job_keywords, scorer, keep=2)
+            exp['tools'] = ", ".join(
+                tool.strip() for tool in (exp.get('tools') or "").split(",")
+                if _relevance(tool, job_keywords, scorer)
+            )
+            return f"Summarized experience at {exp.get('company')}"
+        return step
+    
+    def drop(i):
+        def step():
+            experience[i] = None
+            return f"Dropped experience at {user_info['experience'][i].get('company')}"
+        return step
+    
+    steps = [drop_details, drop_skills]
+    steps += [summarize(i) for i in order]
+    steps += [drop(i) for i in order[:-1]]
+    for step in steps:
+        report.actions.append(step())
+        current = dict(compacted, experience=[exp for exp in experience if exp is not None])
+        text = format_user_info(current)
+        report.tokens_after = estimate_tokens(text)
+        if report.tokens_after <= token_budget:
+            break
+    
+    return text, report
+
 def create_resume_prompt(job_description: str, user_info: dict) -> ChatPromptTemplate:
     """Create the prompt template for resume generation."""
-    formatted_user_info = format_user_info(user_info)
-    
     template = """You are an expert resume writer and ATS optimization specialist.
     Create a professional resume in markdown format optimized for the following job description:
     
@@ -116,33 +493,151 @@ def create_resume_prompt(job_description: str, user_info: dict) -> ChatPromptTem
     
     return ChatPromptTemplate.from_template(template)
 
-def generate_resume(job_description: str, user_info: dict) -> ResumeContent:
-    """Generate a resume using the LLM."""
-    llm = initialize_llm()
-    parser = PydanticOutputParser(pydantic_object=ResumeContent)
+def build_resume_request(job_description: str, user_info: dict, token_budget: Optional[int] = None,
+                         job_profile: Optional[JobProfile] = None) -> Tuple[str, StructuredOutputParser]:
+    """Build the formatted resume prompt and the parser for its response.
     
-    prompt = create_resume_prompt(
-        job_description=job_description,
-        user_info=user_info
-    )
+    ``token_budget`` (default ``settings.PROMPT_TOKEN_BUDGET``, 0 disables)
+    caps the estimated size of the candidate information in the prompt.
+    A ``job_profile`` with an analysis adds the posting's key requirements
+    to the prompt and supplies the keywords used for compaction.
+    """
+    if token_budget is None:
+        token_budget = settings.PROMPT_TOKEN_BUDGET
+    with instrumentation.stage('prompt_build'):
+        # The scorer recomputes the ATS score, so a missing one is not worth a fix-up request
+        parser = StructuredOutputParser(ResumeContent, defaults={'ats_score': 0.0})
+        
+        prompt = create_resume_prompt(
+            job_description=job_description,
+            user_info=user_info
+        )
+        
+        # Format the prompt with the parser instructions
+        requirements = job_profile.requirements_text() if job_profile is not None else ""
+        formatted_prompt = prompt.format(
+            job_description=f"{job_description}\n\nKey requirements:\n{requirements}" if requirements else job_description,
+            user_info=format_user_info(user_info, job_description, token_budget, job_profile),
+            format_instructions=parser.get_format_instructions()
+        )
     
-    # Format the prompt with the parser instructions
-    formatted_prompt = prompt.format(
-        job_description=job_description,
-        user_info=format_user_info(user_info),
-        format_instructions=parser.get_format_instructions()
-    )
+    return formatted_prompt, parser
+
+def generate_resume(job_description: str, user_info: dict, token_budget: Optional[int] = None,
+                    job_profile: Optional[JobProfile] = None) -> ResumeContent:
+    """Generate a resume using the LLM."""
+    formatted_prompt, parser = build_resume_request(job_description, user_info, token_budget, job_profile)
     
-    # Generate the response
-    response = llm.invoke(formatted_prompt)
+    # Generate and parse the response
+    return invoke_llm(formatted_prompt, parse=parser)
+
+async def agenerate_resume(job_description: str, user_info: dict, token_budget: Optional[int] = None,
+                           job_profile: Optional[JobProfile] = None) -> ResumeContent:
+    """Generate a resume using the LLM without blocking the event loop."""
+    formatted_prompt, parser = build_resume_request(job_description, user_info, token_budget, job_profile)
+    return await ainvoke_llm(formatted_prompt, parse=parser)
+
+def _best_of_temperatures(temperatures: Optional[List[float]]) -> List[float]:
+    if temperatures is None:
+        temperatures = [float(t) for t in settings.BEST_OF_TEMPERATURES.split(",")]
+    if not temperatures:
+        raise ValueError("At least one temperature is required")
+    return temperatures
+
+def _score_candidate(resume: ResumeContent, job_description: str, scorer: ATSScorer,
+                     job_profile: Optional[JobProfile]) -> ScoreReport:
+    if job_profile is not None:
+        return scorer.analyze_profile(MarkdownFormatter.format_resume(resume), job_profile)
+    return scorer.analyze(MarkdownFormatter.format_resume(resume), job_description)
+
+async def _ascore_candidate(resume: ResumeContent, job_description: str, scorer: ATSScorer,
+                            job_profile: Optional[JobProfile],
+                            scoring_slot: Optional[Callable[[], AsyncContextManager]]) -> ScoreReport:
+    """Score a candidate in a worker thread, inside ``scoring_slot`` when given."""
+    async with (scoring_slot() if scoring_slot is not None else contextlib.nullcontext()):
+        return await asyncio.to_thread(_score_candidate, resume, job_description, scorer, job_profile)
+
+def generate_best_resume(job_description: str, user_info: dict, temperatures: Optional[List[float]] = None,
+                         min_score: Optional[float] = None, scorer: Optional[ATSScorer] = None,
+                         token_budget: Optional[int] = None,
+                         job_profile: Optional[JobProfile] = None) -> Tuple[ResumeContent, ScoreReport]:
+    """Generate one candidate per temperature concurrently and return the best.
     
-    # Parse the response
-    return parser.parse(response.content)
+    Each candidate is scored as soon as it arrives. The first one scoring at
+    least ``min_score`` (default ``settings.MIN_ATS_SCORE``) is returned right
+    away; otherwise the highest-scoring candidate is returned once all have
+    finished. Calls still running are abandoned rather than interrupted, since
+    threads cannot be cancelled; use ``agenerate_best_resume`` to cancel them.
+    Temperatures default to ``settings.BEST_OF_TEMPERATURES``. Candidates are
+    scored against ``job_profile`` when one is given.
+    """
+    temperatures = _best_of_temperatures(temperatures)
+    min_score = settings.MIN_ATS_SCORE if min_score is None else min_score
+    scorer = scorer or ATSScorer()
+    formatted_prompt, parser = build_resume_request(job_description, user_info, token_budget, job_profile)
+    
+    best, error = None, None
+    pool = ThreadPoolExecutor(max_workers=len(temperatures))
+    # Each call runs in a copy of this context so it keeps the caller's rate-limit priority
+    futures = [pool.submit(contextvars.copy_context().run, invoke_llm, formatted_prompt, parser, t)
+               for t in temperatures]
+    try:
+        for future in as_completed(futures):
+            if future.exception() is not None:
+                error = future.exception()
+                continue
+            candidate = (future.result(), _score_candidate(future.result(), job_description, scorer, job_profile))
+            if best is None or candidate[1].total_score > best[1].total_score:
+                best = candidate
+            if best[1].total_score >= min_score:
+                break
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        instrumentation.count('best_of_cancelled_total', sum(not future.done() for future in futures))
+    if best is None:
+        raise error
+    return best
 
-def analyze_job_description(job_description: str) -> dict:
-    """Analyze a job description to extract key requirements."""
-    llm = initialize_llm()
+async def agenerate_best_resume(job_description: str, user_info: dict, temperatures: Optional[List[float]] = None,
+                                min_score: Optional[float] = None, scorer: Optional[ATSScorer] = None,
+                                token_budget: Optional[int] = None, job_profile: Optional[JobProfile] = None,
+                                scoring_slot: Optional[Callable[[], AsyncContextManager]] = None
+                                ) -> Tuple[ResumeContent, ScoreReport]:
+    """Async counterpart of ``generate_best_resume``; calls still in flight are cancelled.
     
+    Candidates are scored in worker threads, so the event loop stays free;
+    ``scoring_slot`` (e.g. an API concurrency limiter's ``slot``) bounds how
+    many scorings run at once.
+    """
+    temperatures = _best_of_temperatures(temperatures)
+    min_score = settings.MIN_ATS_SCORE if min_score is None else min_score
+    scorer = scorer or ATSScorer()
+    formatted_prompt, parser = build_resume_request(job_description, user_info, token_budget, job_profile)
+    
+    best, error = None, None
+    pending = {asyncio.ensure_future(ainvoke_llm(formatted_prompt, parser, t)) for t in temperatures}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                report = await _ascore_candidate(task.result(), job_description, scorer, job_profile, scoring_slot)
+                if best is None or report.total_score > best[1].total_score:
+                    best = (task.result(), report)
+            if best is not None and best[1].total_score >= min_score:
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        instrumentation.count('best_of_cancelled_total', len(pending))
+    if best is None:
+        raise error
+    return best
+
+def build_job_analysis_request(job_description: str) -> Tuple[str, StructuredOutputParser]:
+    """Build the formatted job description analysis prompt and the parser for its response."""
     template = """Analyze the following job description and extract:
     1. Required skills
     2. Preferred qualifications
@@ -152,10 +647,32 @@ def analyze_job_description(job_description: str) -> dict:
     Job Description:
     {job_description}
     
-    Provide the analysis in a structured format.
+    {format_instructions}
     """
     
+    parser = StructuredOutputParser(JobAnalysis, defaults={
+        'preferred_qualifications': [],
+        'key_responsibilities': [],
+        'industry_keywords': []
+    })
     prompt = ChatPromptTemplate.from_template(template)
-    response = llm.invoke(prompt.format(job_description=job_description))
+    formatted_prompt = prompt.format(
+        job_description=job_description,
+        format_instructions=parser.get_format_instructions()
+    )
+    return formatted_prompt, parser
+
+def analyze_job_description(job_description: str) -> JobAnalysis:
+    """Analyze a job description to extract key requirements.
     
-    return response.content 
\ No newline at end of file
+    The result feeds ``MarkdownFormatter.format_job_analysis`` and
+    ``job_profile.build_job_profile``; use ``JobProfileStore`` to analyze
+    each posting only once.
+    """
+    formatted_prompt, parser = build_job_analysis_request(job_description)
+    return invoke_llm(formatted_prompt, parse=parser)
+
+async def aanalyze_job_description(job_description: str) -> JobAnalysis:
+    """Analyze a job description without blocking the event loop."""
+    formatted_prompt, parser = build_job_analysis_request(job_description)
+    return await ainvoke_llm(formatted_prompt, parse=parser)
\ No newline at end of file
@@ -1,5 +1,6 @@
-from typing import List, Dict
-from .llm_utils import ResumeContent, ResumeSection
+from typing import List, Dict, Union
+from .models import ResumeContent, ResumeSection, JobAnalysis
+from .instrumentation import instrumentation
 
 class MarkdownFormatter:
     @staticmethod
@@ -7,6 +8,11 @@ class MarkdownFormatter:
         """Format a resume section in markdown."""
         return f"## {section.title}\n\n{section.content}\n\n"
 
+    @staticmethod
+    def format_summary(summary: str) -> str:
+        """Format the professional summary in markdown."""
+        return f"## Professional Summary\n\n{summary}\n\n"
+
     @staticmethod
     def format_skills(skills: List[str]) -> str:
         """Format skills section in markdown."""
@@ -18,10 +24,15 @@ class MarkdownFormatter:
     @staticmethod
     def format_resume(resume: ResumeContent) -> str:
         """Format the complete resume in markdown."""
+        with instrumentation.stage('markdown_render'):
+            return MarkdownFormatter._format_resume(resume)
+
+    @staticmethod
+    def _format_resume(resume: ResumeContent) -> str:
         markdown = []
         
         # Add summary
-        markdown.append(f"## Professional Summary\n\n{resume.summary}\n\n")
+        markdown.append(MarkdownFormatter.format_summary(resume.summary))
         
         # Add experience sections
         for exp in resume.experience:
@@ -53,8 +64,10 @@ class MarkdownFormatter:
         return "".join(markdown)
 
     @staticmethod
-    def format_job_analysis(analysis: Dict) -> str:
+    def format_job_analysis(analysis: Union[Dict, JobAnalysis]) -> str:
         """Format job description analysis in markdown."""
+        if isinstance(analysis, JobAnalysis):
+            analysis = analysis.model_dump()
         markdown = ["## Job Description Analysis\n\n"]
         
         # Add required skills
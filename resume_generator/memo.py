@@ -0,0 +1,61 @@
+from typing import Any, Callable, MutableMapping, Optional, Tuple
+from collections import OrderedDict
+from datetime import date, datetime
+import hashlib
+import json
+from pydantic import BaseModel
+
+def _encode(value: Any) -> Any:
+    """Make models and dates JSON-serializable for hashing."""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+def content_hash(*parts: Any) -> str:
+    """Hash the content of arbitrary JSON-like values, models and dates."""
+    payload = json.dumps(parts, sort_keys=True, default=_encode, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class SessionMemo:
+    """Memoizes derived artifacts in a session-scoped mapping.
+    
+    Entries are keyed on an artifact name plus a content hash of its inputs,
+    so a value is recomputed only when its inputs actually change. Backed by
+    any mutable mapping, such as Streamlit's ``st.session_state``, so results
+    survive script reruns. The least recently used entries are evicted
+    beyond ``max_entries``.
+    """
+
+    def __init__(self, store: MutableMapping, namespace: str = "_memo", max_entries: int = 64):
+        if namespace not in store:
+            store[namespace] = OrderedDict()
+        self.entries: "OrderedDict[Tuple[str, str], Any]" = store[namespace]
+        self.max_entries = max_entries
+
+    def get(self, name: str, *inputs: Any) -> Optional[Any]:
+        """Return a memoized artifact for these inputs, or None."""
+        key = (name, content_hash(*inputs))
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def set(self, name: str, inputs: Tuple, value: Any):
+        """Store an artifact computed from ``inputs``."""
+        key = (name, content_hash(*inputs))
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get_or_compute(self, name: str, inputs: Tuple, compute: Callable[..., Any]) -> Any:
+        """Return the memoized artifact, computing it from ``inputs`` on a miss."""
+        value = self.get(name, *inputs)
+        if value is None:
+            value = compute(*inputs)
+            self.set(name, inputs, value)
+        return value
@@ -0,0 +1,22 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+class ResumeSection(BaseModel):
+    """Model for a resume section."""
+    title: str = Field(description="The title of the section")
+    content: str = Field(description="The content of the section in markdown format")
+
+class ResumeContent(BaseModel):
+    """Model for the complete resume content."""
+    summary: str = Field(description="Professional summary in markdown format")
+    experience: List[ResumeSection] = Field(description="List of experience sections")
+    education: List[ResumeSection] = Field(description="List of education sections")
+    skills: List[str] = Field(description="List of skills")
+    ats_score: float = Field(description="ATS compatibility score (0-100)")
+
+class JobAnalysis(BaseModel):
+    """Structured analysis of a job description."""
+    required_skills: List[str] = Field(description="Skills the job requires")
+    preferred_qualifications: List[str] = Field(description="Qualifications that are preferred but not required")
+    key_responsibilities: List[str] = Field(description="Main responsibilities of the role")
+    industry_keywords: List[str] = Field(description="Industry-specific keywords and terms")
@@ -0,0 +1,256 @@
+from typing import Any, Dict, List, Optional, Tuple, Type
+import json
+import re
+import threading
+from langchain.output_parsers import PydanticOutputParser
+from langchain_core.exceptions import OutputParserException
+from pydantic import BaseModel, ValidationError
+
+FENCE_PATTERN = re.compile(r'```(?:json)?\s*(.*?)```', re.DOTALL)
+LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+
+def extract_json_object(text: str) -> str:
+    """Return the first JSON object in a completion, dropping code fences and surrounding prose.
+    
+    A truncated object is returned up to the end of the text.
+    """
+    fenced = FENCE_PATTERN.search(text)
+    if fenced and '{' in fenced.group(1):
+        text = fenced.group(1)
+    start = text.find('{')
+    if start == -1:
+        raise OutputParserException("No JSON object found in the model output", llm_output=text)
+    
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return text[start:]
+
+def repair_json_text(text: str) -> str:
+    """Fix common JSON malformations in one pass.
+    
+    Escapes raw control characters inside strings, drops trailing commas,
+    converts Python literals (True/False/None) and closes strings, arrays
+    and objects left open by a truncated completion.
+    """
+    out = []
+    closers = []
+    in_string = escaped = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char == '\n':
+                char = '\\n'
+            elif char == '\t':
+                char = '\\t'
+            elif char < ' ':
+                char = ''
+            out.append(char)
+        elif char == '"':
+            in_string = True
+            out.append(char)
+        elif char in '{[':
+            closers.append('}' if char == '{' else ']')
+            out.append(char)
+        elif char in '}]':
+            if closers:
+                closers.pop()
+            _drop_trailing_comma(out)
+            out.append(char)
+        elif char.isalpha():
+            end = i + 1
+            while end < len(text) and text[end].isalpha():
+                end += 1
+            word = text[i:end]
+            out.append(LITERALS.get(word, word))
+            i = end
+            continue
+        else:
+            out.append(char)
+        i += 1
+    
+    if in_string:
+        out.append('"')
+    while closers:
+        _drop_trailing_comma(out)
+        out.append(closers.pop())
+    return "".join(out)
+
+def load_repaired_json(text: str, max_trims: int = 3) -> Any:
+    """Extract, repair and decode the JSON object in a completion.
+    
+    If a truncated completion ends inside a member, the incomplete tail is
+    trimmed back to the previous comma (up to ``max_trims`` times) so the
+    members before it are kept.
+    """
+    candidate = extract_json_object(text)
+    for attempt in range(max_trims + 1):
+        try:
+            return json.loads(repair_json_text(candidate))
+        except json.JSONDecodeError:
+            cut = candidate.rfind(',')
+            if attempt == max_trims or cut == -1:
+                raise
+            candidate = candidate[:cut]
+
+def _drop_trailing_comma(out: List[str]):
+    """Remove a comma (and the whitespace after it) at the end of the output."""
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ',':
+        del out[j:]
+
+class PartialOutputError(OutputParserException):
+    """The completion is valid JSON but fails schema validation on some fields."""
+
+    def __init__(self, data: Dict, errors: List[Dict], llm_output: str):
+        super().__init__(f"Model output failed validation: {errors}", llm_output=llm_output)
+        self.data = data
+        self.errors = errors
+
+    @property
+    def fields(self) -> List[str]:
+        """Top-level fields with validation errors."""
+        return sorted({str(error['loc'][0]) for error in self.errors if error['loc']})
+
+class StructuredOutputParser:
+    """Parses a completion into a pydantic model, repairing it locally when possible.
+    
+    Well-formed output goes through ``PydanticOutputParser`` as before.
+    Otherwise the JSON object is extracted from fences and prose, common
+    malformations are repaired, ``defaults`` fill in missing fields, and the
+    result is validated again. When the JSON is usable but some fields still
+    fail validation, ``PartialOutputError`` is raised so the caller can send a
+    small fix-up request for just those fields (``fix_up_prompt``).
+    """
+
+    def __init__(self, model: Type[BaseModel], defaults: Optional[Dict[str, Any]] = None):
+        self.model = model
+        self.defaults = defaults or {}
+        self._parser = PydanticOutputParser(pydantic_object=model)
+
+    def get_format_instructions(self) -> str:
+        return self._parser.get_format_instructions()
+
+    def parse(self, text: str) -> BaseModel:
+        return self.parse_with_outcome(text)[0]
+
+    def parse_with_outcome(self, text: str) -> Tuple[BaseModel, str]:
+        """Parse a completion; the outcome is 'clean' or 'repaired'."""
+        try:
+            return self._parser.parse(text), 'clean'
+        except OutputParserException:
+            pass
+        
+        try:
+            data = load_repaired_json(text)
+        except ValueError as exc:
+            raise OutputParserException(f"Could not repair the model output: {exc}", llm_output=text)
+        if not isinstance(data, dict):
+            raise OutputParserException("Model output is not a JSON object", llm_output=text)
+        for field, value in self.defaults.items():
+            data.setdefault(field, value)
+        try:
+            return self.model.model_validate(data), 'repaired'
+        except ValidationError as exc:
+            errors = [{'loc': list(error['loc']), 'msg': error['msg']} for error in exc.errors()]
+            raise PartialOutputError(data, errors, text)
+
+    def fix_up_prompt(self, error: PartialOutputError) -> str:
+        """Build a small request asking the model to correct only the invalid fields."""
+        schema = self.model.model_json_schema()
+        field_schema = {field: schema['properties'].get(field, {}) for field in error.fields}
+        if '$defs' in schema:
+            field_schema['$defs'] = schema['$defs']
+        current = {field: error.data.get(field) for field in error.fields}
+        problems = "\n".join(f"- {'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors)
+        return (
+            "The following fields of a JSON object do not match their schema.\n"
+            f"Errors:\n{problems}\n\n"
+            f"Schema of these fields:\n{json.dumps(field_schema)}\n\n"
+            f"Current values:\n{json.dumps(current)}\n\n"
+            f"Return only a JSON object with the corrected fields: {', '.join(error.fields)}."
+        )
+
+    def apply_fix_up(self, error: PartialOutputError, text: str) -> Tuple[BaseModel, str]:
+        """Merge a fix-up completion into the partial output; returns the model and its JSON."""
+        try:
+            fix = load_repaired_json(text)
+        except ValueError as exc:
+            raise OutputParserException(f"Could not parse the fix-up output: {exc}", llm_output=text)
+        data = dict(error.data)
+        data.update({field: fix[field] for field in error.fields if isinstance(fix, dict) and field in fix})
+        try:
+            return self.model.model_validate(data), json.dumps(data)
+        except ValidationError as exc:
+            raise OutputParserException(f"Fix-up output failed validation: {exc}", llm_output=text)
+
+class RepairStats:
+    """Counts structured-output outcomes and the regenerations they avoided.
+    
+    Outcomes are 'clean' (parsed as generated), 'repaired' (fixed locally),
+    'fixed' (fixed with a fix-up request) and 'failed'. Tokens and seconds
+    saved are estimated against regenerating the whole response.
+    """
+    
+    OUTCOMES = ('clean', 'repaired', 'fixed', 'failed')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = dict.fromkeys(self.OUTCOMES, 0)
+            self.fixup_requests = 0
+            self.tokens_saved = 0
+            self.latency_saved = 0.0
+
+    def record(self, outcome: str, tokens_saved: int = 0, latency_saved: float = 0.0, fixup: bool = False):
+        with self._lock:
+            self.counts[outcome] += 1
+            self.fixup_requests += fixup
+            self.tokens_saved += tokens_saved
+            self.latency_saved += latency_saved
+
+    def snapshot(self) -> Dict[str, float]:
+        """Counts plus parse-failure, fix-up and unrecovered rates."""
+        with self._lock:
+            total = sum(self.counts.values())
+            rate = lambda n: n / total if total else 0.0
+            return {
+                **self.counts,
+                'total': total,
+                'fixup_requests': self.fixup_requests,
+                'parse_failure_rate': rate(total - self.counts['clean']),
+                'fixup_rate': rate(self.fixup_requests),
+                'unrecovered_rate': rate(self.counts['failed']),
+                'tokens_saved': self.tokens_saved,
+                'latency_saved': round(self.latency_saved, 3)
+            }
+
+repair_stats = RepairStats()
@@ -0,0 +1,333 @@
+from typing import Dict, Optional, Tuple
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+import asyncio
+import sqlite3
+import threading
+import time
+from config import settings
+from .instrumentation import instrumentation
+
+# Lower rank is served first
+PRIORITIES = {'interactive': 0, 'batch': 1}
+
+# Waiters whose process stopped polling for this long are dropped from the queue
+STALE_WAITER_SECONDS = 10.0
+
+_priority: ContextVar[str] = ContextVar('llm_priority', default='interactive')
+
+def current_priority() -> str:
+    """Priority of LLM calls made from the current context."""
+    return _priority.get()
+
+@contextmanager
+def llm_priority(level: str):
+    """Run the enclosed LLM calls at ``level`` ('interactive' or 'batch')."""
+    if level not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{level}', expected one of {tuple(PRIORITIES)}")
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+class RateLimitTimeout(TimeoutError):
+    """No budget became available within the maximum wait."""
+
+class Reservation:
+    """A granted request, booked with its estimated token count."""
+
+    def __init__(self, limiter: "RateLimiter", usage_id: int, tokens: int, priority: str, waited: float):
+        self.limiter = limiter
+        self.usage_id = usage_id
+        self.tokens = tokens
+        self.priority = priority
+        self.waited = waited
+
+    @staticmethod
+    def _reported_tokens(response) -> int:
+        usage = getattr(response, 'usage_metadata', None) or {}
+        return usage.get('input_tokens', 0) + usage.get('output_tokens', 0)
+
+    def settle(self, response):
+        """Replace the estimate with the tokens the response reports, if any."""
+        tokens = self._reported_tokens(response)
+        if tokens:
+            self.limiter._update_usage(self.usage_id, tokens)
+            self.tokens = tokens
+
+    async def asettle(self, response):
+        """Async counterpart of ``settle``; the store is updated in a worker thread."""
+        tokens = self._reported_tokens(response)
+        if tokens:
+            await self.limiter._in_thread(self.limiter._update_usage, self.usage_id, tokens)
+            self.tokens = tokens
+
+    def release(self):
+        """Give the booking back, e.g. when the request was never answered."""
+        self.limiter._release(self.usage_id)
+        self.tokens = 0
+
+class RateLimiter:
+    """Sliding-window RPM/TPM limiter with a priority queue, shared through SQLite.
+    
+    Each granted request is booked with its estimated tokens (prompt plus
+    ``max_tokens``), corrected to the reported usage once the response
+    arrives. A caller is granted once nobody ranks ahead of it in the queue
+    and the last ``window`` seconds leave room for one more request and its
+    tokens. A single request larger than the token budget is let through
+    alone once the window is empty. ``path`` is the shared SQLite file;
+    without one the limits only apply within this process. A budget of 0 is
+    unlimited.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0, path: str = "",
+                 max_wait: Optional[float] = None, window: float = 60.0, poll_interval: float = 0.05):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.path = path
+        self.max_wait = max_wait
+        self.window = window
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None, timeout=30)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_usage ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, tokens INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS rate_usage_ts ON rate_usage (ts)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_waiters ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, rank INTEGER NOT NULL, heartbeat REAL NOT NULL)"
+        )
+        # Wait times of recent grants and timeouts in this process, by priority
+        self._waits = {level: deque(maxlen=1000) for level in PRIORITIES}
+        self._granted = dict.fromkeys(PRIORITIES, 0)
+        self._timeouts = dict.fromkeys(PRIORITIES, 0)
+        self._waiting = dict.fromkeys(PRIORITIES, 0)
+
+    def _transaction(self, fn, *args):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(*args)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def _enqueue(self, rank: int) -> int:
+        def enqueue():
+            return self._conn.execute(
+                "INSERT INTO rate_waiters (rank, heartbeat) VALUES (?, ?)", (rank, time.time())
+            ).lastrowid
+        return self._transaction(enqueue)
+
+    def _dequeue(self, waiter: int):
+        self._transaction(lambda: self._conn.execute("DELETE FROM rate_waiters WHERE id = ?", (waiter,)))
+
+    def _update_usage(self, usage_id: int, tokens: int):
+        self._transaction(lambda: self._conn.execute("UPDATE rate_usage SET tokens = ? WHERE id = ?", (tokens, usage_id)))
+
+    def _release(self, usage_id: int):
+        self._transaction(lambda: self._conn.execute("DELETE FROM rate_usage WHERE id = ?", (usage_id,)))
+
+    def _abandon(self, attempt: Tuple[int, Optional[int], float]):
+        """Undo an acquire attempt whose caller was cancelled: release its booking or leave the queue."""
+        waiter, usage_id, _ = attempt
+        if usage_id is not None:
+            self._release(usage_id)
+        else:
+            self._dequeue(waiter)
+
+    async def _in_thread(self, fn, *args, undo=None):
+        """Run a store call in a worker thread, letting it finish if the caller is cancelled.
+        
+        A call cancelled this way still completes; ``undo`` is then run on its
+        result in a worker thread.
+        """
+        future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if undo is not None:
+                def undo_result(done):
+                    if not done.cancelled() and done.exception() is None:
+                        asyncio.get_running_loop().run_in_executor(None, undo, done.result())
+                future.add_done_callback(undo_result)
+            raise
+
+    def _try_acquire(self, waiter: int, rank: int, tokens: int) -> Tuple[int, Optional[int], float]:
+        """One attempt at the head of the queue; returns ``(waiter, usage id or None, retry after)``."""
+        def attempt():
+            nonlocal waiter
+            conn = self._conn
+            now = time.time()
+            conn.execute("DELETE FROM rate_usage WHERE ts <= ?", (now - self.window,))
+            conn.execute("DELETE FROM rate_waiters WHERE heartbeat < ?", (now - STALE_WAITER_SECONDS,))
+            if conn.execute("UPDATE rate_waiters SET heartbeat = ? WHERE id = ?", (now, waiter)).rowcount == 0:
+                # Dropped as stale (e.g. a stalled event loop); rejoin at the back
+                waiter = conn.execute("INSERT INTO rate_waiters (rank, heartbeat) VALUES (?, ?)", (rank, now)).lastrowid
+            ahead = conn.execute(
+                "SELECT 1 FROM rate_waiters WHERE rank < ? OR (rank = ? AND id < ?) LIMIT 1",
+                (rank, rank, waiter)
+            ).fetchone()
+            if ahead:
+                return None, self.poll_interval
+            
+            requests, used, oldest = conn.execute("SELECT COUNT(*), COALESCE(SUM(tokens), 0), MIN(ts) FROM rate_usage").fetchone()
+            fits_requests = not self.requests_per_minute or requests < self.requests_per_minute
+            fits_tokens = not self.tokens_per_minute or used + tokens <= self.tokens_per_minute or requests == 0
+            if not (fits_requests and fits_tokens):
+                return None, oldest + self.window - now
+            usage_id = conn.execute("INSERT INTO rate_usage (ts, tokens) VALUES (?, ?)", (now, tokens)).lastrowid
+            conn.execute("DELETE FROM rate_waiters WHERE id = ?", (waiter,))
+            return usage_id, 0.0
+        
+        usage_id, retry_after = self._transaction(attempt)
+        return waiter, usage_id, retry_after
+
+    def _deadline(self, timeout: Optional[float]) -> Optional[float]:
+        timeout = self.max_wait if timeout is None else timeout
+        return None if timeout is None else time.perf_counter() + timeout
+
+    def _sleep_time(self, retry_after: float, deadline: Optional[float], priority: str) -> float:
+        if deadline is not None and time.perf_counter() >= deadline:
+            with self._lock:
+                self._timeouts[priority] += 1
+            instrumentation.count('llm_rate_limit_timeouts_total', priority=priority)
+            raise RateLimitTimeout("No LLM rate budget became available within the maximum wait")
+        return min(max(retry_after, 0.005), self.poll_interval)
+
+    def _granted_reservation(self, usage_id: int, tokens: int, priority: str, start: float) -> Reservation:
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._granted[priority] += 1
+            self._waits[priority].append(waited)
+        instrumentation.count('llm_rate_limit_granted_total', priority=priority)
+        instrumentation.observe('llm_rate_limit_wait_seconds', waited, priority=priority)
+        return Reservation(self, usage_id, tokens, priority, waited)
+
+    def acquire(self, tokens: int, priority: Optional[str] = None, timeout: Optional[float] = None) -> Reservation:
+        """Block until a request of ``tokens`` estimated tokens fits the budgets.
+        
+        ``priority`` defaults to the context's (see ``llm_priority``) and
+        ``timeout`` to ``max_wait``; ``RateLimitTimeout`` is raised when it
+        runs out.
+        """
+        priority = priority or current_priority()
+        rank = PRIORITIES[priority]
+        start = time.perf_counter()
+        deadline = self._deadline(timeout)
+        waiter = self._enqueue(rank)
+        usage_id = None
+        with self._lock:
+            self._waiting[priority] += 1
+        try:
+            while True:
+                waiter, usage_id, retry_after = self._try_acquire(waiter, rank, tokens)
+                if usage_id is not None:
+                    return self._granted_reservation(usage_id, tokens, priority, start)
+                time.sleep(self._sleep_time(retry_after, deadline, priority))
+        finally:
+            with self._lock:
+                self._waiting[priority] -= 1
+            if usage_id is None:
+                self._dequeue(waiter)
+
+    async def aacquire(self, tokens: int, priority: Optional[str] = None, timeout: Optional[float] = None) -> Reservation:
+        """Async counterpart of ``acquire``; store access runs in a worker thread.
+        
+        Cancelling the caller never leaves a booking or queue entry behind.
+        """
+        priority = priority or current_priority()
+        rank = PRIORITIES[priority]
+        start = time.perf_counter()
+        deadline = self._deadline(timeout)
+        waiter = await self._in_thread(self._enqueue, rank, undo=self._dequeue)
+        usage_id = None
+        with self._lock:
+            self._waiting[priority] += 1
+        try:
+            while True:
+                waiter, usage_id, retry_after = await self._in_thread(
+                    self._try_acquire, waiter, rank, tokens, undo=self._abandon
+                )
+                if usage_id is not None:
+                    return self._granted_reservation(usage_id, tokens, priority, start)
+                await asyncio.sleep(self._sleep_time(retry_after, deadline, priority))
+        finally:
+            with self._lock:
+                self._waiting[priority] -= 1
+            if usage_id is None:
+                await self._in_thread(self._dequeue, waiter)
+
+    def stats(self) -> Dict:
+        """Budget use in the current window, queue depth and wait times.
+        
+        ``queue_depth`` and ``window`` cover every process sharing the store;
+        the per-priority counters and wait times cover this process.
+        """
+        def read():
+            now = time.time()
+            requests, used = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM rate_usage WHERE ts > ?", (now - self.window,)
+            ).fetchone()
+            depth = dict(self._conn.execute(
+                "SELECT rank, COUNT(*) FROM rate_waiters WHERE heartbeat >= ? GROUP BY rank",
+                (now - STALE_WAITER_SECONDS,)
+            ).fetchall())
+            return requests, used, depth
+        
+        requests, used, depth = self._transaction(read)
+        with self._lock:
+            priorities = {}
+            for level, rank in PRIORITIES.items():
+                waits = sorted(self._waits[level])
+                priorities[level] = {
+                    'queue_depth': depth.get(rank, 0),
+                    'waiting': self._waiting[level],
+                    'granted': self._granted[level],
+                    'timeouts': self._timeouts[level],
+                    'wait_mean': round(sum(waits) / len(waits), 4) if waits else 0.0,
+                    'wait_p95': round(waits[int(0.95 * (len(waits) - 1))], 4) if waits else 0.0,
+                    'wait_max': round(waits[-1], 4) if waits else 0.0
+                }
+        return {
+            'requests_per_minute': self.requests_per_minute,
+            'tokens_per_minute': self.tokens_per_minute,
+            'window': {'requests': requests, 'tokens': used},
+            'queue_depth': sum(depth.values()),
+            'priorities': priorities
+        }
+
+_limiter = None
+_limiter_configured = False
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Return the shared rate limiter, built from settings on first use; None when no budget is set."""
+    global _limiter, _limiter_configured
+    if not _limiter_configured:
+        with _limiter_lock:
+            if not _limiter_configured:
+                if settings.LLM_REQUESTS_PER_MINUTE or settings.LLM_TOKENS_PER_MINUTE:
+                    _limiter = RateLimiter(
+                        settings.LLM_REQUESTS_PER_MINUTE,
+                        settings.LLM_TOKENS_PER_MINUTE,
+                        settings.LLM_RATE_LIMIT_PATH,
+                        max_wait=settings.LLM_RATE_LIMIT_MAX_WAIT or None
+                    )
+                _limiter_configured = True
+    return _limiter
+
+def set_rate_limiter(limiter: Optional[RateLimiter]):
+    """Replace the shared rate limiter. Pass None to disable rate limiting."""
+    global _limiter, _limiter_configured
+    with _limiter_lock:
+        _limiter = limiter
+        _limiter_configured = True
@@ -0,0 +1,303 @@
+from typing import Dict, List, Optional, Tuple
+from contextlib import contextmanager
+import difflib
+import json
+import sqlite3
+import threading
+import time
+from pydantic import BaseModel, Field
+from config import settings
+from .models import ResumeContent, ResumeSection
+from .markdown_formatter import MarkdownFormatter
+from .llm_cache import MemoryCache
+from .memo import content_hash
+from .job_profile import job_hash
+
+class ResumeVersion(BaseModel):
+    """Metadata and section hashes of one stored resume version."""
+    id: int = Field(description="Version id, increasing in save order")
+    application: str = Field(description="Application (e.g. company and position) the version belongs to")
+    label: str = Field("", description="Free-form label")
+    created_at: float = Field(description="Unix time the version was saved")
+    ats_score: float = Field(description="ATS score stored with the resume")
+    profile_hash: Optional[str] = Field(None, description="Content hash of the user profile it was generated from")
+    job_hash: Optional[str] = Field(None, description="Content hash of the job description it targets")
+    sections: Dict[str, str] = Field(description="Section name -> content hash, in resume order")
+
+class SectionChange(BaseModel):
+    """A section that differs between two versions."""
+    name: str = Field(description="Section name, e.g. 'experience-0'")
+    status: str = Field(description="'added', 'removed' or 'changed'")
+    before: Optional[str] = Field(None, description="Section markdown in the older version")
+    after: Optional[str] = Field(None, description="Section markdown in the newer version")
+    diff: str = Field("", description="Unified diff of the section markdown")
+
+class ResumeDiff(BaseModel):
+    """Section-level comparison of two resume versions."""
+    old_version: int
+    new_version: int
+    unchanged: List[str] = Field(default_factory=list, description="Sections with identical content")
+    changes: List[SectionChange] = Field(default_factory=list, description="Added, removed and changed sections")
+
+def split_sections(resume: ResumeContent) -> List[Tuple[str, object]]:
+    """The resume's sections as ``(name, value)`` pairs in resume order."""
+    sections = [('summary', resume.summary)]
+    sections += [(f'experience-{i}', section) for i, section in enumerate(resume.experience)]
+    sections += [(f'education-{i}', section) for i, section in enumerate(resume.education)]
+    sections.append(('skills', resume.skills))
+    return sections
+
+def _encode(value) -> str:
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+def _section_markdown(name: str, body: str) -> str:
+    value = json.loads(body)
+    if name == 'summary':
+        return MarkdownFormatter.format_summary(value)
+    if name == 'skills':
+        return MarkdownFormatter.format_skills(value)
+    return MarkdownFormatter.format_section(ResumeSection(**value))
+
+class ResumeStore:
+    """SQLite store of resume versions and user profiles with content-addressed sections.
+    
+    Section and profile bodies live in one ``blobs`` table keyed by content
+    hash, so storage grows with unique content rather than with the number
+    of versions. Versions are indexed by application, so listing and
+    fetching are index lookups. Decoded bodies are kept in an in-memory LRU
+    tier. ``path`` defaults to an in-memory database.
+    """
+
+    def __init__(self, path: str = "", cache_size: int = 1024):
+        self.path = path
+        self.cache = MemoryCache(cache_size)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, body TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS versions ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, application TEXT NOT NULL, label TEXT NOT NULL, "
+            "created_at REAL NOT NULL, ats_score REAL NOT NULL, profile_hash TEXT, job_hash TEXT);"
+            "CREATE INDEX IF NOT EXISTS versions_application ON versions (application, id);"
+            "CREATE TABLE IF NOT EXISTS version_sections ("
+            "version_id INTEGER NOT NULL, position INTEGER NOT NULL, name TEXT NOT NULL, hash TEXT NOT NULL, "
+            "PRIMARY KEY (version_id, position));"
+            "CREATE INDEX IF NOT EXISTS version_sections_hash ON version_sections (hash);"
+            "CREATE TABLE IF NOT EXISTS profiles (name TEXT PRIMARY KEY, hash TEXT NOT NULL, updated_at REAL NOT NULL);"
+        )
+
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements in one write transaction, rolled back on any error."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _put_blob(self, body: str) -> str:
+        digest = content_hash(body)
+        self._conn.execute("INSERT OR IGNORE INTO blobs (hash, body) VALUES (?, ?)", (digest, body))
+        self.cache.set(digest, body)
+        return digest
+
+    def _get_blobs(self, hashes: List[str]) -> Dict[str, str]:
+        """Bodies for ``hashes``, reading only those missing from the memory tier."""
+        bodies = {}
+        missing = []
+        for digest in set(hashes):
+            body = self.cache.get(digest)
+            if body is None:
+                missing.append(digest)
+            else:
+                bodies[digest] = body
+        if missing:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT hash, body FROM blobs WHERE hash IN ({','.join('?' * len(missing))})", missing
+                ).fetchall()
+            for digest, body in rows:
+                self.cache.set(digest, body)
+                bodies[digest] = body
+        return bodies
+
+    def save(self, application: str, resume: ResumeContent, label: str = "",
+             profile: Optional[dict] = None, job_description: Optional[str] = None) -> ResumeVersion:
+        """Store a new version of an application's resume.
+        
+        ``profile`` (the user info the resume was generated from) is stored
+        alongside, deduplicated like sections.
+        """
+        now = time.time()
+        with self._transaction():
+            profile_hash = self._put_blob(_encode(profile)) if profile is not None else None
+            job = job_hash(job_description) if job_description is not None else None
+            version_id = self._conn.execute(
+                "INSERT INTO versions (application, label, created_at, ats_score, profile_hash, job_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (application, label, now, resume.ats_score, profile_hash, job)
+            ).lastrowid
+            sections = {name: self._put_blob(_encode(value)) for name, value in split_sections(resume)}
+            self._conn.executemany(
+                "INSERT INTO version_sections (version_id, position, name, hash) VALUES (?, ?, ?, ?)",
+                [(version_id, position, name, digest) for position, (name, digest) in enumerate(sections.items())]
+            )
+        return ResumeVersion(
+            id=version_id, application=application, label=label, created_at=now, ats_score=resume.ats_score,
+            profile_hash=profile_hash, job_hash=job, sections=sections
+        )
+
+    def _versions(self, where: str, params: tuple) -> List[ResumeVersion]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, application, label, created_at, ats_score, profile_hash, job_hash "
+                f"FROM versions WHERE {where} ORDER BY id", params
+            ).fetchall()
+            if not rows:
+                return []
+            ids = [row[0] for row in rows]
+            section_rows = self._conn.execute(
+                "SELECT version_id, name, hash FROM version_sections "
+                f"WHERE version_id IN ({','.join('?' * len(ids))}) ORDER BY version_id, position", ids
+            ).fetchall()
+        sections: Dict[int, Dict[str, str]] = {version_id: {} for version_id in ids}
+        for version_id, name, digest in section_rows:
+            sections[version_id][name] = digest
+        fields = ('id', 'application', 'label', 'created_at', 'ats_score', 'profile_hash', 'job_hash')
+        return [ResumeVersion(**dict(zip(fields, row)), sections=sections[row[0]]) for row in rows]
+
+    def version(self, version_id: int) -> Optional[ResumeVersion]:
+        """Metadata of one version, or None."""
+        versions = self._versions("id = ?", (version_id,))
+        return versions[0] if versions else None
+
+    def list_versions(self, application: str) -> List[ResumeVersion]:
+        """Every version of an application, oldest first."""
+        return self._versions("application = ?", (application,))
+
+    def latest(self, application: str) -> Optional[ResumeVersion]:
+        """The most recent version of an application, or None."""
+        versions = self._versions("id = (SELECT MAX(id) FROM versions WHERE application = ?)", (application,))
+        return versions[0] if versions else None
+
+    def applications(self) -> List[str]:
+        """Names of all applications with stored versions."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT application FROM versions ORDER BY application")]
+
+    def get(self, version_id: int) -> Optional[ResumeContent]:
+        """Rebuild the resume of a version, or None if it does not exist."""
+        version = self.version(version_id)
+        if version is None:
+            return None
+        bodies = self._get_blobs(list(version.sections.values()))
+        resume = {'experience': [], 'education': [], 'ats_score': version.ats_score}
+        for name, digest in version.sections.items():
+            value = json.loads(bodies[digest])
+            field = name.split('-')[0]
+            if field in ('experience', 'education'):
+                resume[field].append(value)
+            else:
+                resume[field] = value
+        return ResumeContent(**resume)
+
+    def diff(self, old_id: int, new_id: int, context: int = 3) -> ResumeDiff:
+        """Compare two versions, loading and diffing only sections whose hashes differ."""
+        old, new = self.version(old_id), self.version(new_id)
+        if old is None or new is None:
+            raise KeyError(f"Unknown resume version: {old_id if old is None else new_id}")
+        result = ResumeDiff(old_version=old_id, new_version=new_id)
+        differing = []
+        for name in list(old.sections) + [name for name in new.sections if name not in old.sections]:
+            before, after = old.sections.get(name), new.sections.get(name)
+            if before == after:
+                result.unchanged.append(name)
+            else:
+                differing.append((name, before, after))
+        bodies = self._get_blobs([digest for _, before, after in differing for digest in (before, after) if digest])
+        
+        for name, before, after in differing:
+            old_markdown = _section_markdown(name, bodies[before]) if before else None
+            new_markdown = _section_markdown(name, bodies[after]) if after else None
+            status = 'added' if before is None else 'removed' if after is None else 'changed'
+            diff = "".join(difflib.unified_diff(
+                (old_markdown or "").splitlines(keepends=True), (new_markdown or "").splitlines(keepends=True),
+                f"v{old_id}/{name}", f"v{new_id}/{name}", n=context
+            ))
+            result.changes.append(SectionChange(name=name, status=status, before=old_markdown, after=new_markdown, diff=diff))
+        return result
+
+    def delete_version(self, version_id: int):
+        """Delete a version; sections no other version uses are removed by ``collect_garbage``."""
+        with self._transaction():
+            self._conn.execute("DELETE FROM version_sections WHERE version_id = ?", (version_id,))
+            self._conn.execute("DELETE FROM versions WHERE id = ?", (version_id,))
+
+    def collect_garbage(self) -> int:
+        """Remove bodies no version or profile references; returns how many were removed."""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM version_sections) "
+                "AND hash NOT IN (SELECT hash FROM profiles) "
+                "AND hash NOT IN (SELECT profile_hash FROM versions WHERE profile_hash IS NOT NULL)"
+            ).rowcount
+        self.cache.clear()
+        return removed
+
+    def save_profile(self, name: str, user_info: dict) -> str:
+        """Store a named user profile and return its content hash."""
+        with self._transaction():
+            digest = self._put_blob(_encode(user_info))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profiles (name, hash, updated_at) VALUES (?, ?, ?)", (name, digest, time.time())
+            )
+        return digest
+
+    def get_profile(self, name: str) -> Optional[dict]:
+        """The latest profile saved under ``name``, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT hash FROM profiles WHERE name = ?", (name,)).fetchone()
+        return self.profile_by_hash(row[0]) if row else None
+
+    def profile_by_hash(self, digest: str) -> Optional[dict]:
+        """A stored profile by content hash, e.g. a version's ``profile_hash``."""
+        body = self._get_blobs([digest]).get(digest)
+        return json.loads(body) if body is not None else None
+
+    def profiles(self) -> List[str]:
+        """Names of the stored profiles."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT name FROM profiles ORDER BY name")]
+
+    def stats(self) -> Dict[str, int]:
+        """Version, section reference and unique body counts."""
+        with self._lock:
+            versions = self._conn.execute("SELECT COUNT(*) FROM versions").fetchone()[0]
+            references = self._conn.execute("SELECT COUNT(*) FROM version_sections").fetchone()[0]
+            blobs, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM blobs").fetchone()
+        return {'versions': versions, 'section_references': references, 'unique_bodies': blobs, 'body_bytes': size}
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_resume_store() -> ResumeStore:
+    """Return the shared resume store, built from settings on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResumeStore(settings.RESUME_STORE_PATH)
+    return _store
+
+def set_resume_store(store: Optional[ResumeStore]):
+    """Replace the shared resume store. Pass None to rebuild it on next use."""
+    global _store
+    with _store_lock:
+        _store = store
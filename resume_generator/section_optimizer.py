@@ -0,0 +1,197 @@
+from typing import List, Optional, Tuple
+import time
+from langchain.prompts import ChatPromptTemplate
+from langchain_core.exceptions import OutputParserException
+from pydantic import BaseModel, Field
+from config import settings
+from .models import ResumeContent, ResumeSection
+from .ats_scorer import ATSScorer, ScoreReport
+from .incremental_scorer import IncrementalATSScorer
+from .markdown_formatter import MarkdownFormatter
+from .llm_utils import build_resume_request, estimate_tokens, invoke_llm
+from .output_repair import StructuredOutputParser
+from .batch import TRANSIENT_ERRORS
+
+# Most missing keywords offered to a single section rewrite
+MAX_PROMPT_KEYWORDS = 15
+
+# Failures that only lose one section's rewrite; anything else (configuration,
+# authentication, bad requests) is raised
+SECTION_ERRORS = (OutputParserException,) + TRANSIENT_ERRORS
+
+class SummaryRewrite(BaseModel):
+    """Rewritten professional summary."""
+    summary: str = Field(description="Professional summary in markdown format")
+
+class SkillsRewrite(BaseModel):
+    """Rewritten skills list."""
+    skills: List[str] = Field(description="List of skills")
+
+class OptimizationReport(BaseModel):
+    """Outcome and token cost of a section-level optimization run."""
+    initial_score: float = Field(description="ATS score before optimization")
+    final_score: float = Field(description="ATS score after optimization")
+    rounds: int = Field(description="Optimization rounds run")
+    rewritten_sections: List[str] = Field(default_factory=list, description="Sections whose rewrite was kept")
+    rejected_sections: List[str] = Field(default_factory=list, description="Rewrites discarded because they did not raise the score")
+    failed_sections: List[str] = Field(default_factory=list, description="Sections whose rewrite request failed")
+    tokens_used: int = Field(0, description="Estimated prompt and completion tokens of the section rewrites")
+    full_regeneration_tokens: int = Field(0, description="Estimated tokens of regenerating the whole resume once")
+    tokens_saved: int = Field(0, description="full_regeneration_tokens minus tokens_used, or 0 if the rewrites cost more")
+    elapsed: float = Field(0.0, description="Wall-clock seconds")
+    stop_reason: str = Field("", description="Why the loop stopped")
+
+def section_strength(scorer: IncrementalATSScorer, name: str) -> float:
+    """How well a section serves the job posting, from 0 (weak) to 1.
+    
+    Combines the share of the job's distinct keywords the section covers
+    (capped at ten) with the action-verb and quantified-achievement checks
+    for experience entries.
+    """
+    section = scorer.sections[name]
+    target = min(10, len(scorer.job_keywords)) or 1
+    coverage = min(1.0, len(section.keywords.keys() & scorer.job_keywords.keys()) / target)
+    if not name.startswith('experience-'):
+        return coverage
+    return 0.6 * coverage + 0.2 * section.has_action_verbs + 0.2 * section.has_quantified
+
+def _section_request(name: str, resume: ResumeContent, job_description: str,
+                     report: ScoreReport) -> Tuple[str, StructuredOutputParser]:
+    """Build the rewrite prompt and parser for one section."""
+    if name == 'summary':
+        parser = StructuredOutputParser(SummaryRewrite)
+        current = resume.summary
+        kind = "professional summary"
+    elif name == 'skills':
+        parser = StructuredOutputParser(SkillsRewrite)
+        current = ", ".join(resume.skills)
+        kind = "skills list"
+    else:
+        parser = StructuredOutputParser(ResumeSection)
+        current = MarkdownFormatter.format_section(_get_section(resume, name))
+        kind = "experience entry"
+    
+    template = """You are an expert resume writer and ATS optimization specialist.
+    Rewrite only the following {kind} of a resume so it matches this job description better:
+    
+    {job_description}
+    
+    Current {kind}:
+    {current}
+    
+    Work these missing keywords in where the candidate's experience supports them: {missing_keywords}
+    Address these suggestions where they apply: {suggestions}
+    Keep every fact, employer, title and date as given; do not invent experience or metrics.
+    
+    {format_instructions}
+    """
+    prompt = ChatPromptTemplate.from_template(template).format(
+        kind=kind,
+        job_description=job_description,
+        current=current,
+        missing_keywords=", ".join(report.missing_keywords[:MAX_PROMPT_KEYWORDS]) or "none",
+        suggestions="; ".join(report.suggestions) or "none",
+        format_instructions=parser.get_format_instructions()
+    )
+    return prompt, parser
+
+def _get_section(resume: ResumeContent, name: str) -> ResumeSection:
+    field, index = name.split('-')
+    return getattr(resume, field)[int(index)]
+
+def _splice(resume: ResumeContent, name: str, rewrite) -> Tuple[ResumeContent, str]:
+    """Return the resume with one section replaced, plus the section's new markdown."""
+    if name == 'summary':
+        return resume.model_copy(update={'summary': rewrite.summary}), MarkdownFormatter.format_summary(rewrite.summary)
+    if name == 'skills':
+        return resume.model_copy(update={'skills': rewrite.skills}), MarkdownFormatter.format_skills(rewrite.skills)
+    field, index = name.split('-')
+    sections = list(getattr(resume, field))
+    sections[int(index)] = rewrite
+    return resume.model_copy(update={field: sections}), MarkdownFormatter.format_section(rewrite)
+
+def optimize_resume(resume: ResumeContent, job_description: str, user_info: dict,
+                    min_score: Optional[float] = None, token_budget: Optional[int] = None,
+                    time_budget: Optional[float] = None, max_rounds: int = 3, sections_per_round: int = 2,
+                    scorer: Optional[ATSScorer] = None) -> Tuple[ResumeContent, OptimizationReport]:
+    """Improve a resume by re-prompting only its weakest sections.
+    
+    Each round rewrites the ``sections_per_round`` weakest rewritable sections
+    (summary, experience entries, skills) using the current missing keywords
+    and suggestions, splices them into the resume and rescores incrementally.
+    A rewrite that does not raise the score is discarded, and so is a section
+    whose rewrite cannot be parsed or hits a transient provider error; neither
+    section is retried. Other errors are raised. The loop stops once the
+    score reaches ``min_score`` (default ``settings.MIN_ATS_SCORE``), after
+    ``max_rounds``, after a round that keeps no rewrite, or when the estimated
+    ``token_budget`` or the ``time_budget`` in seconds would be exceeded. ``user_info`` is only used to estimate what one full
+    regeneration would have cost.
+    """
+    start = time.perf_counter()
+    min_score = settings.MIN_ATS_SCORE if min_score is None else min_score
+    incremental = IncrementalATSScorer.from_resume(resume, job_description, scorer)
+    full_prompt, _ = build_resume_request(job_description, user_info)
+    full_cost = estimate_tokens(full_prompt) + estimate_tokens(resume.model_dump_json())
+    score = incremental.score()
+    report = OptimizationReport(initial_score=score, final_score=score, rounds=0, full_regeneration_tokens=full_cost)
+    
+    while True:
+        if score >= min_score:
+            report.stop_reason = "min_score reached"
+            break
+        if report.rounds >= max_rounds:
+            report.stop_reason = "max_rounds reached"
+            break
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            report.stop_reason = "time budget exhausted"
+            break
+        
+        candidates = ['summary', 'skills'] + [f'experience-{i}' for i in range(len(resume.experience))]
+        candidates = [name for name in candidates
+                      if name not in report.rejected_sections and name not in report.failed_sections]
+        if not candidates:
+            report.stop_reason = "no sections left to rewrite"
+            break
+        candidates.sort(key=lambda name: section_strength(incremental, name))
+        score_report = incremental.report()
+        requests = [(name,) + _section_request(name, resume, job_description, score_report)
+                    for name in candidates[:sections_per_round]]
+        # Completions are assumed to be about as long as the section they replace
+        round_cost = sum(
+            estimate_tokens(prompt) + estimate_tokens(incremental.sections[name].text)
+            for name, prompt, _ in requests
+        )
+        if token_budget is not None and report.tokens_used + round_cost > token_budget:
+            report.stop_reason = "token budget exhausted"
+            break
+        
+        report.rounds += 1
+        kept = 0
+        for name, prompt, parse in requests:
+            try:
+                rewrite = invoke_llm(prompt, parse=parse)
+            except SECTION_ERRORS:
+                # Keep the rewrites accepted so far; this section is not retried
+                report.tokens_used += estimate_tokens(prompt)
+                report.failed_sections.append(name)
+                continue
+            report.tokens_used += estimate_tokens(prompt) + estimate_tokens(rewrite.model_dump_json())
+            candidate, markdown = _splice(resume, name, rewrite)
+            previous = incremental.sections[name].text
+            incremental.set_section(name, markdown)
+            new_score = incremental.score()
+            if new_score <= score:
+                incremental.set_section(name, previous)
+                report.rejected_sections.append(name)
+                continue
+            resume, score = candidate, new_score
+            report.rewritten_sections.append(name)
+            kept += 1
+        if not kept:
+            report.stop_reason = "no improvement in the last round"
+            break
+    
+    report.final_score = score
+    report.tokens_saved = max(0, report.full_regeneration_tokens - report.tokens_used)
+    report.elapsed = round(time.perf_counter() - start, 3)
+    return resume, report
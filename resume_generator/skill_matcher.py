@@ -0,0 +1,400 @@
+from typing import Dict, List, Tuple
+from collections import deque
+from functools import lru_cache
+
+# Default skill taxonomy, one skill per line: canonical name followed by aliases, separated by "|"
+DEFAULT_TAXONOMY = """
+python | python3
+java
+javascript | js | ecmascript
+typescript | ts
+c++ | cpp
+c#
+.net | dotnet
+asp.net
+objective-c
+f#
+golang | go lang
+rust
+ruby
+ruby on rails | rails
+php
+perl
+scala
+kotlin
+swift
+dart
+elixir
+erlang
+haskell
+clojure
+lua
+matlab
+julia
+groovy
+bash | shell scripting
+powershell
+sql
+nosql
+pl/sql
+t-sql
+graphql
+html | html5
+css | css3
+sass | scss
+node.js | nodejs | node js
+react | react.js | reactjs
+react native
+angular | angular.js | angularjs
+vue.js | vue | vuejs
+next.js | nextjs
+nuxt.js | nuxtjs
+svelte
+jquery
+redux
+express.js | expressjs
+nestjs | nest.js
+django
+flask
+fastapi
+spring | spring framework
+spring boot
+hibernate
+laravel
+symfony
+.net core | dotnet core
+entity framework
+tailwind css | tailwind
+bootstrap
+webpack
+vite
+babel
+jest
+mocha
+cypress
+selenium
+playwright
+pytest
+junit
+rest api | rest apis | restful api | restful apis
+grpc
+websockets | websocket
+microservices | microservice architecture
+event-driven architecture | event driven architecture
+domain-driven design | domain driven design | ddd
+test-driven development | test driven development | tdd
+behavior-driven development | bdd
+object-oriented programming | object oriented programming | oop
+functional programming
+design patterns
+data structures
+algorithms
+system design
+distributed systems
+concurrency
+multithreading
+aws | amazon web services
+azure | microsoft azure
+gcp | google cloud | google cloud platform
+aws lambda | lambda
+amazon s3 | s3
+amazon ec2 | ec2
+amazon rds | rds
+dynamodb
+cloudformation
+cloud native
+serverless
+docker
+kubernetes | k8s
+helm
+openshift
+terraform
+ansible
+puppet
+chef
+pulumi
+ci/cd | cicd | continuous integration | continuous delivery | continuous deployment
+jenkins
+github actions
+gitlab ci
+circleci
+travis ci
+argo cd | argocd
+git
+github
+gitlab
+bitbucket
+devops
+devsecops
+site reliability engineering | sre
+infrastructure as code | iac
+linux
+unix
+nginx
+apache
+prometheus
+grafana
+datadog
+new relic
+splunk
+elk stack | elk
+elasticsearch
+logstash
+kibana
+opentelemetry
+observability
+postgresql | postgres
+mysql
+mariadb
+sqlite
+oracle
+sql server | mssql | microsoft sql server
+mongodb | mongo
+redis
+cassandra
+couchbase
+neo4j
+snowflake
+bigquery
+redshift
+databricks
+apache spark | spark | pyspark
+hadoop
+hive
+apache kafka | kafka
+rabbitmq
+apache airflow | airflow
+dbt
+etl
+elt
+data pipelines | data pipeline
+data engineering
+data warehousing | data warehouse
+data modeling
+data visualization
+data analysis
+data science
+big data
+machine learning | ml
+deep learning
+artificial intelligence | ai
+natural language processing | nlp
+computer vision
+reinforcement learning
+generative ai | genai
+large language models | large language model | llm | llms
+prompt engineering
+retrieval-augmented generation | retrieval augmented generation | rag
+tensorflow
+pytorch
+keras
+scikit-learn | sklearn | scikit learn
+pandas
+numpy
+scipy
+matplotlib
+hugging face | huggingface
+langchain
+xgboost
+mlops
+feature engineering
+statistics
+a/b testing | ab testing
+tableau
+power bi | powerbi
+looker
+excel | microsoft excel
+r programming
+spss
+sas
+jira
+confluence
+agile
+scrum
+kanban
+project management
+product management
+stakeholder management
+technical leadership
+team leadership
+mentoring
+code review | code reviews
+communication
+problem solving
+cross-functional collaboration
+unit testing
+integration testing
+end-to-end testing | e2e testing
+performance testing
+load testing
+test automation
+quality assurance | qa
+security
+cybersecurity | cyber security
+penetration testing
+oauth | oauth2 | oauth 2.0
+jwt
+sso | single sign-on
+identity and access management | iam
+encryption
+owasp
+networking
+tcp/ip
+dns
+load balancing
+caching
+cdn
+performance optimization
+scalability
+high availability
+disaster recovery
+ios
+android
+mobile development
+flutter
+xamarin
+web development
+frontend development | front-end development | frontend | front-end
+backend development | back-end development | backend | back-end
+full stack development | full-stack development | full stack | full-stack
+ui/ux | ui ux
+user experience | ux
+user interface | ui
+figma
+sketch
+adobe xd
+accessibility | a11y
+responsive design
+seo
+api design
+api gateway
+message queues | message queue
+event sourcing
+cqrs
+blockchain
+solidity
+embedded systems
+firmware
+iot | internet of things
+fpga
+verilog
+vhdl
+computer networks
+operating systems
+""".strip()
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+def parse_taxonomy(text: str) -> Dict[str, str]:
+    """Parse taxonomy lines of ``canonical | alias | ...`` into a lowercase alias -> canonical map."""
+    phrases = {}
+    for line in text.splitlines():
+        names = [name.strip().lower() for name in line.split('|') if name.strip()]
+        if not names or names[0].startswith('#'):
+            continue
+        for name in names:
+            phrases.setdefault(name, names[0])
+    return phrases
+
+class SkillMatcher:
+    """Multi-pattern skill phrase matcher built on an Aho-Corasick automaton.
+
+    Every phrase (canonical names and aliases) is compiled into a single
+    automaton once, after which all occurrences in a text are found in one
+    pass over its characters, independent of the number of phrases. Matching
+    is case-insensitive and only accepts occurrences delimited by non-word
+    characters, so "java" does not match inside "javascript" while "c++",
+    "ci/cd" and "node.js" match as written. Overlapping matches are resolved
+    leftmost-longest, e.g. "machine learning engineer" yields
+    "machine learning" rather than also "learning".
+    """
+
+    def __init__(self, phrases: Dict[str, str]):
+        self.phrases = phrases
+        self._canonical: List[str] = []
+        self._lengths: List[int] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        for phrase, canonical in phrases.items():
+            self._add(phrase.lower(), canonical)
+        self._build_failure_links()
+
+    @classmethod
+    def from_taxonomy(cls, text: str) -> "SkillMatcher":
+        """Build a matcher from taxonomy lines (see ``DEFAULT_TAXONOMY``)."""
+        return cls(parse_taxonomy(text))
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillMatcher":
+        """Build a matcher from a taxonomy file."""
+        with open(path, encoding='utf-8') as f:
+            return cls.from_taxonomy(f.read())
+
+    def _add(self, phrase: str, canonical: str):
+        node = 0
+        for char in phrase:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(len(self._canonical))
+        self._canonical.append(canonical)
+        self._lengths.append(len(phrase))
+
+    def _build_failure_links(self):
+        # Breadth-first, so each node's failure target is finished before its children
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child].extend(self._output[self._fail[child]])
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """Return non-overlapping ``(start, end, canonical)`` matches in a lowercase text, in order."""
+        goto, fail, output, lengths = self._goto, self._fail, self._output, self._lengths
+        candidates = []
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not output[node]:
+                continue
+            if end < len(text) and _is_word_char(text[end]) and _is_word_char(char):
+                continue
+            for pattern in output[node]:
+                start = end - lengths[pattern]
+                if start and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                    continue
+                candidates.append((start, end, pattern))
+
+        # Leftmost-longest selection of non-overlapping matches
+        candidates.sort(key=lambda match: (match[0], -match[1]))
+        matches = []
+        position = 0
+        for start, end, pattern in candidates:
+            if start >= position:
+                matches.append((start, end, self._canonical[pattern]))
+                position = end
+        return matches
+
+    def extract(self, text: str) -> List[str]:
+        """Return the canonical skills mentioned in a text, in order of appearance."""
+        return [canonical for _, _, canonical in self.find_all(text.lower())]
+
+@lru_cache(maxsize=None)
+def default_matcher() -> SkillMatcher:
+    """The shared matcher for ``DEFAULT_TAXONOMY``, compiled on first use."""
+    return SkillMatcher.from_taxonomy(DEFAULT_TAXONOMY)
@@ -0,0 +1,210 @@
+from typing import List, Tuple, Any, Optional, Iterator
+import json
+import time
+from pydantic import BaseModel, Field, ValidationError
+from langchain_core.messages import AIMessageChunk
+from .models import ResumeSection
+from .llm_utils import (
+    build_resume_request,
+    get_llm,
+    complete_structured,
+    _answered_by,
+    _cache_lookup,
+    _cache_store,
+    _call_kwargs,
+    _parse_completion,
+    _reserve
+)
+from .output_repair import repair_json_text
+from .instrumentation import instrumentation
+
+class ResumeStreamEvent(BaseModel):
+    """An event emitted while a resume is streamed from the LLM."""
+    kind: str = Field(description="'token', 'item', 'section' or 'complete'")
+    field: Optional[str] = Field(default=None, description="Top-level ResumeContent field the event belongs to")
+    index: Optional[int] = Field(default=None, description="Position of a completed list item")
+    value: Any = Field(default=None, description="Token text, parsed item or section value, or the final ResumeContent")
+    elapsed: float = Field(description="Seconds since the request started")
+
+class ResumeStreamParser:
+    """Incrementally parses a streamed JSON object one top-level field at a time.
+    
+    Text before the opening brace (prose, code fences) is skipped. ``feed``
+    returns ``(field, index, value)`` tuples: ``index`` is None when a whole
+    top-level field has completed, or the position of a completed element of a
+    top-level list. Malformed values (trailing commas, Python literals) are
+    repaired as in ``output_repair``; values that still fail to parse are
+    skipped, and the final completion is validated separately.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.done = False
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+        self.item_start = None
+        self.item_index = 0
+        self.in_list = False
+
+    def feed(self, text: str) -> List[Tuple[str, Optional[int], Any]]:
+        """Consume more text and return the fields and items it completed."""
+        self.buffer += text
+        completed = []
+        buffer = self.buffer
+        for i in range(self.pos, len(buffer)):
+            if self.done:
+                break
+            char = buffer[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.key_start is not None:
+                        self.key = json.loads(buffer[self.key_start:i + 1])
+                        self.key_start = None
+                continue
+            
+            if char == '"':
+                self.in_string = True
+                if self.depth == 1 and self.value_start is None:
+                    self.key_start = i
+                elif self.in_list and self.depth == 2 and self.item_start is None:
+                    self.item_start = i
+            elif char == ':' and self.depth == 1 and self.value_start is None:
+                self.value_start = i + 1
+            elif char in '{[':
+                if self.depth == 0:
+                    if char == '{':
+                        self.depth = 1
+                    continue
+                if self.depth == 1 and char == '[' and self.value_start is not None and not buffer[self.value_start:i].strip():
+                    self.in_list = True
+                    self.item_index = 0
+                elif self.in_list and self.depth == 2 and self.item_start is None:
+                    self.item_start = i
+                self.depth += 1
+            elif char in '}]':
+                if self.depth == 0:
+                    continue
+                self.depth -= 1
+                if self.in_list and self.depth == 1:
+                    self._finish_item(buffer, i, completed)
+                    self.in_list = False
+                elif self.depth == 0:
+                    self._finish_field(buffer, i, completed)
+                    self.done = True
+            elif char == ',':
+                if self.in_list and self.depth == 2:
+                    self._finish_item(buffer, i, completed)
+                elif self.depth == 1:
+                    self._finish_field(buffer, i, completed)
+            elif self.in_list and self.depth == 2 and self.item_start is None and not char.isspace():
+                self.item_start = i
+        self.pos = len(buffer)
+        return completed
+
+    def _finish_item(self, buffer: str, end: int, completed: list):
+        if self.item_start is not None:
+            ok, value = _load_value(buffer[self.item_start:end])
+            if ok:
+                completed.append((self.key, self.item_index, value))
+            self.item_index += 1
+        self.item_start = None
+
+    def _finish_field(self, buffer: str, end: int, completed: list):
+        if self.key is not None and self.value_start is not None:
+            ok, value = _load_value(buffer[self.value_start:end])
+            if ok:
+                completed.append((self.key, None, value))
+        self.key = None
+        self.value_start = None
+
+def _load_value(text: str) -> Tuple[bool, Any]:
+    """Decode one streamed JSON value, repairing it if needed; ``(False, None)`` if it cannot be parsed."""
+    try:
+        return True, json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return True, json.loads(repair_json_text(text.strip()))
+    except ValueError:
+        return False, None
+
+def _valid_section(value: Any) -> bool:
+    try:
+        ResumeSection.model_validate(value)
+        return True
+    except ValidationError:
+        return False
+
+def stream_resume(job_description: str, user_info: dict) -> Iterator[ResumeStreamEvent]:
+    """Generate a resume, yielding tokens and sections as they arrive.
+    
+    Emits a ``token`` event per streamed chunk, an ``item`` event for each
+    completed experience or education entry (and skill), a ``section`` event
+    when a top-level field completes, and a final ``complete`` event carrying
+    the validated ``ResumeContent``. Cached completions are replayed as a
+    single chunk. The final completion is repaired locally or with a fix-up
+    request exactly as ``invoke_llm`` does.
+    """
+    start = time.perf_counter()
+    formatted_prompt, parser = build_resume_request(job_description, user_info)
+    cache, key, cached = _cache_lookup(formatted_prompt)
+    reservation = None
+    if cached is not None:
+        chunks = iter([AIMessageChunk(content=cached)])
+    else:
+        reservation = _reserve(formatted_prompt)
+        chunks = get_llm().stream(formatted_prompt, **_call_kwargs(None, parser))
+    
+    stream_parser = ResumeStreamParser()
+    parts = []
+    model = None
+    usage = None
+    try:
+        for chunk in chunks:
+            model = _answered_by(chunk)
+            if getattr(chunk, 'usage_metadata', None):
+                # Providers report usage on the final chunk
+                usage = chunk
+            text = chunk.content
+            if not text:
+                continue
+            parts.append(text)
+            yield ResumeStreamEvent(kind='token', value=text, elapsed=time.perf_counter() - start)
+            for field, index, value in stream_parser.feed(text):
+                if index is not None and field in ('experience', 'education') and not _valid_section(value):
+                    # Left for the final validation and fix-up
+                    continue
+                yield ResumeStreamEvent(
+                    kind='section' if index is None else 'item',
+                    field=field,
+                    index=index,
+                    value=value,
+                    elapsed=time.perf_counter() - start
+                )
+    except BaseException:
+        # Abandoned or failed streams give their booking back
+        if reservation is not None:
+            reservation.release()
+        raise
+    if reservation is not None and usage is not None:
+        reservation.settle(usage)
+    
+    content = "".join(parts)
+    instrumentation.observe('stage_duration_seconds', time.perf_counter() - start, stage='llm_stream')
+    if cached is not None:
+        resume = _parse_completion(content, parser)
+    else:
+        resume, content = complete_structured(formatted_prompt, content, parser, time.perf_counter() - start)
+        if model is not None:
+            _cache_store(cache, key, content, model)
+    yield ResumeStreamEvent(kind='complete', value=resume, elapsed=time.perf_counter() - start)
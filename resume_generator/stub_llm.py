@@ -0,0 +1,63 @@
+from typing import Iterator
+import asyncio
+import hashlib
+import json
+import time
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+class StubChatModel:
+    """Local stand-in for ChatGroq used for development and load testing.
+    
+    Returns deterministic completions derived from a hash of the prompt:
+    a valid ``ResumeContent`` or ``JobAnalysis`` JSON object for structured
+    prompts and short plain text otherwise. ``latency`` simulates the provider's
+    response time without using any tokens.
+    """
+
+    def __init__(self, latency: float = 0.0, chunk_size: int = 16):
+        self.latency = latency
+        self.chunk_size = chunk_size
+
+    def _complete(self, prompt) -> str:
+        prompt = str(prompt)
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        if '"required_skills"' in prompt:
+            return json.dumps({
+                "required_skills": ["Python", "AWS"],
+                "preferred_qualifications": ["Kubernetes"],
+                "key_responsibilities": [f"Build cloud services (stub {digest})"],
+                "industry_keywords": ["cloud", "microservices"]
+            })
+        if '"properties"' in prompt:
+            return json.dumps({
+                "summary": f"Results-driven engineer (stub {digest}) with 5 years of experience.",
+                "experience": [{
+                    "title": "Senior Software Engineer - Example Corp",
+                    "content": "- Developed cloud-native services used by 2M users\n- Improved deployment time by 50%"
+                }],
+                "education": [{
+                    "title": "Master of Science in Computer Science",
+                    "content": "Example University, 2020"
+                }],
+                "skills": ["Python", "AWS", "Docker", "Kubernetes"],
+                "ats_score": 80.0
+            })
+        return f"Stub analysis {digest}:\n1. Required skills: Python, AWS\n2. Preferred qualifications: Kubernetes"
+
+    def invoke(self, prompt, **kwargs) -> AIMessage:
+        if self.latency:
+            time.sleep(self.latency)
+        return AIMessage(content=self._complete(prompt))
+
+    async def ainvoke(self, prompt, **kwargs) -> AIMessage:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return AIMessage(content=self._complete(prompt))
+
+    def stream(self, prompt, **kwargs) -> Iterator[AIMessageChunk]:
+        content = self._complete(prompt)
+        delay = self.latency / max(1, len(content) // self.chunk_size)
+        for i in range(0, len(content), self.chunk_size):
+            if delay:
+                time.sleep(delay)
+            yield AIMessageChunk(content=content[i:i + self.chunk_size])
@@ -0,0 +1,160 @@
+from typing import Dict
+from functools import lru_cache
+from .skill_matcher import parse_taxonomy
+
+# Single-word synonyms, one per line: canonical word followed by aliases, separated by "|"
+DEFAULT_SYNONYMS = """
+kubernetes | k8s
+javascript | js
+typescript | ts
+postgresql | postgres
+api | apis
+mongodb | mongo
+database | db | dbs
+application | app | apps
+repository | repo | repos
+configuration | config
+environment | env
+infrastructure | infra
+documentation | docs
+development | dev
+operations | ops
+management | mgmt
+senior | sr
+junior | jr
+manager | mgr
+lead | led
+build | built
+write | wrote | written
+run | ran
+teach | taught
+drive | drove | driven
+grow | grew | grown
+begin | began | begun
+bring | brought
+think | thought
+""".strip()
+
+VOWELS = frozenset('aeiouy')
+
+# Words ending in "s" that are not plurals, so "news" does not become "new"
+NOT_PLURAL = frozenset("""
+news plus thus lens bias alias atlas canvas pandas always perhaps series species
+""".split())
+
+def _has_vowel(text: str) -> bool:
+    return any(char in VOWELS for char in text)
+
+def stem(word: str) -> str:
+    """Light suffix-stripping stemmer for lowercase words.
+    
+    Strips inflections (-s, -ed, -ing, -ies, -ied), then common derivational
+    suffixes (-ization, -ation, -ator, -ate, -ment) and a final "e", so that
+    "developed", "developing" and "development" all become "develop" and
+    "integrate", "integrated", "integration" and "integrator" all become
+    "integr". Words in ``NOT_PLURAL`` keep their final "s" ("news" is not "new").
+    Stems are match keys, not words; see ``TokenNormalizer.display``.
+    ``benchmarks/stem_table.py`` checks these examples.
+    """
+    if len(word) < 4 or not word.isalpha() or word in NOT_PLURAL:
+        return word
+    
+    # Inflectional suffixes
+    stripped = False
+    if word.endswith(('ies', 'ied')) and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith('ing') and len(word) >= 6 and _has_vowel(word[:-3]):
+        word, stripped = word[:-3], True
+    elif word.endswith('ed') and len(word) >= 6 and _has_vowel(word[:-2]):
+        word, stripped = word[:-2], True
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    if stripped:
+        if len(word) > 2 and word[-1] == word[-2] and word[-1] not in VOWELS and word[-1] not in 'lsz':
+            word = word[:-1]
+        elif word.endswith('at'):
+            # "integrat" -> "integrate", so it meets the "ate" rule below
+            word += 'e'
+    
+    # Derivational suffixes; "-ation" and "-ator" become "-ate" exactly when
+    # the "-ate" form itself is long enough to be stripped
+    if word.endswith('ization'):
+        word = word[:-5] + 'e'
+    elif word.endswith('ation') and len(word) >= 8:
+        word = word[:-5] + 'ate'
+    elif word.endswith('ator') and len(word) >= 7:
+        word = word[:-4] + 'ate'
+    if word.endswith('ate') and len(word) >= 6:
+        word = word[:-3]
+    if word.endswith('ment') and len(word) >= 9:
+        word = word[:-4]
+    if word.endswith('e') and len(word) >= 4:
+        word = word[:-1]
+    return word
+
+class TokenNormalizer:
+    """Maps keyword tokens to canonical match keys through synonyms and a stemmer.
+    
+    The synonym table is compiled once to alias -> stemmed canonical, so
+    "k8s" and "kubernetes" share a key, and every other alphabetic token is
+    stemmed. ``normalize`` is memoized in a bounded LRU cache: keyword
+    vocabularies repeat heavily across resumes and postings, so nearly every
+    call after warm-up is a single cache hit. The cache is per process, like
+    every other in-memory tier.
+    """
+
+    def __init__(self, synonyms: Dict[str, str], cache_size: int = 65536):
+        self.table = {alias: stem(canonical) for alias, canonical in synonyms.items()}
+        self._names = {stem(canonical): canonical for canonical in synonyms.values()}
+        # Readable form of each key: the shortest token seen for it
+        self._surface: Dict[str, str] = {}
+        self.cache_size = cache_size
+        self.normalize = lru_cache(maxsize=cache_size)(self._normalize)
+
+    @classmethod
+    def from_synonyms(cls, text: str, cache_size: int = 65536) -> "TokenNormalizer":
+        """Build a normalizer from synonym lines (see ``DEFAULT_SYNONYMS``)."""
+        return cls(parse_taxonomy(text), cache_size)
+
+    @classmethod
+    def from_file(cls, path: str, cache_size: int = 65536) -> "TokenNormalizer":
+        """Build a normalizer from a synonyms file."""
+        with open(path, encoding='utf-8') as f:
+            return cls.from_synonyms(f.read(), cache_size)
+
+    def _normalize(self, token: str) -> str:
+        key = self.table.get(token)
+        if key is None:
+            key = stem(token)
+        surface = self._surface.get(key)
+        if surface is None and len(self._surface) < self.cache_size:
+            self._surface[key] = self._names.get(key, token)
+        elif surface is not None and key not in self._names and (len(token), token) < (len(surface), surface):
+            self._surface[key] = token
+        return key
+
+    def display(self, key: str) -> str:
+        """A readable token for a match key, e.g. "develop" for "develop" or "kubernetes" for "kubernet"."""
+        return self._surface.get(key, key)
+
+    def stats(self) -> Dict[str, float]:
+        """Cache hits, misses, hit rate and size."""
+        info = self.normalize.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+            'size': info.currsize,
+            'max_size': info.maxsize
+        }
+
+    def clear(self):
+        """Drop the memoized keys and their readable forms."""
+        self.normalize.cache_clear()
+        self._surface.clear()
+
+@lru_cache(maxsize=None)
+def default_normalizer() -> TokenNormalizer:
+    """The shared normalizer for ``DEFAULT_SYNONYMS``."""
+    return TokenNormalizer.from_synonyms(DEFAULT_SYNONYMS)